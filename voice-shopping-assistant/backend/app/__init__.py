@@ -1,16 +1,60 @@
-from flask import Flask
+import threading
+from functools import partial
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
-from app.database import init_db
+from app.config import Config
+from app.database import configure_storage, init_db
+from app.tenancy import household_from_request, is_valid_household
 
-def create_app():
+def create_app(config_object=None):
     app = Flask(__name__)
     CORS(app)
+    if config_object is not None:
+        # Storage has to follow the selected config before anything touches the database.
+        # The history writer goes first: it flushes what's queued into the old storage.
+        app.config.from_object(config_object)
+        from app.history_writer import configure_history_writer
+        configure_history_writer(config_object)
+        configure_storage(config_object)
+        from app.events import change_feed
+        change_feed.max_streams = config_object.MAX_EVENT_STREAMS
     init_db()
 
-    from app.routes import shopping_routes, voice_routes, suggestion_routes, apriori_routes
+    @app.before_request
+    def bind_household():
+        # Every list, history and suggestion query is scoped to the caller's household
+        household = household_from_request(request)
+        if not is_valid_household(household):
+            return jsonify({'error': 'Invalid household id'}), 400
+        g.household = household
+
+    # Heavy dependencies (pandas, apyori) load off the boot path: on a warm-up
+    # thread started below, or else on the first request that needs rules
+    from app.apriori import engine
+    from app.training import train_engine, warm_up
+    engine.set_loader(partial(train_engine, config=config_object or Config))
+
+    from app.history_writer import history_writer
+    from app.name_resolver import name_resolver, load_known_names, load_household_names
+    name_resolver.set_loader(load_known_names)
+    # Purchased names stay in their own household's vocabulary
+    name_resolver.set_household_loader(load_household_names)
+    history_writer.add_listener(name_resolver.add_purchases)
+
+    # New purchases can make items "due", so refresh suggestions after each history flush.
+    # Rules aren't retrained here: they're mined from the basket dataset, and a full
+    # apriori pass costs far more than the flush it would follow.
+    from app.events import suggestion_publisher
+    history_writer.add_listener(lambda events: suggestion_publisher.notify(*{e[0] for e in events}))
+
+    from app.routes import shopping_routes, voice_routes, suggestion_routes, apriori_routes, events_routes
     app.register_blueprint(shopping_routes.bp)
     app.register_blueprint(voice_routes.bp)
     app.register_blueprint(suggestion_routes.bp)
     app.register_blueprint(apriori_routes.bp)
+    app.register_blueprint(events_routes.bp)
+
+    if (config_object or Config).WARM_START:
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
 
-    return app
\ No newline at end of file
+    return app
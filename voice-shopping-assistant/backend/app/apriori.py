@@ -1,45 +1,388 @@
-from typing import List, Dict, Any
-from apyori import apriori
+from typing import List, Dict, Any, Iterable, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import bisect
 import json
+import math
+import os
+import random
+import time
+
+from app.lazy import RunOnce
+
+# apyori is imported inside the functions that mine, so importing this module
+# (every suggestion route does) stays cheap until rules are actually needed.
+
+# Local thresholds are shaved slightly so float rounding in count / n can never
+# drop an itemset that sits exactly on the global support boundary.
+_LOCAL_SUPPORT_SLACK = 1e-9
+
+# Fewest transactions an itemset must appear in to be locally frequent in a
+# partition. Below this, almost every local pair or triple clears the local
+# threshold and phase 1 mines far more candidates than the serial run does.
+_MIN_LOCAL_COUNT = 10
+
+
+def _mine_partition(args):
+    """Return the itemsets that are frequent inside a single partition."""
+    from apyori import gen_support_records, TransactionManager
+
+    partition, min_support = args
+    manager = TransactionManager(partition)
+    return [tuple(sorted(r.items)) for r in gen_support_records(manager, min_support)]
+
+
+def _count_partition(args):
+    """Count how many transactions of a partition contain each candidate."""
+    partition, candidates = args
+    index: Dict[str, set] = {}
+    for tid, transaction in enumerate(partition):
+        for item in transaction:
+            index.setdefault(item, set()).add(tid)
+
+    counts = []
+    for candidate in candidates:
+        tids = index.get(candidate[0], set())
+        for item in candidate[1:]:
+            if not tids:
+                break
+            tids = tids & index.get(item, set())
+        counts.append(len(tids))
+    return counts
+
+
+def _rules_from_records(records) -> List[Dict[str, Any]]:
+    """Flatten apyori relation records into rule dicts."""
+    rules = []
+    for record in records:
+        support = float(record.support)
+        for stat in record.ordered_statistics:
+            rules.append({
+                'base': list(stat.items_base),
+                'add': list(stat.items_add),
+                'support': support,
+                'confidence': float(stat.confidence),
+                'lift': float(stat.lift)
+            })
+    return rules
+
+
+def _relation_records(supports: Dict[frozenset, float], min_confidence: float, min_lift: float):
+    """Yield relation records from a downward-closed itemset -> support map.
+
+    Mirrors apyori's own record and statistic order, without needing a
+    TransactionManager over the full data.
+    """
+    from apyori import OrderedStatistic, RelationRecord
+
+    for items in sorted(supports, key=lambda c: (len(c), sorted(c))):
+        support = supports[items]
+        stats = []
+        sorted_items = sorted(items)
+        for base_length in range(len(items)):
+            for combination_set in combinations(sorted_items, base_length):
+                base = frozenset(combination_set)
+                add = items - base
+                confidence = support / (supports[base] if base else 1.0)
+                lift = confidence / supports[add]
+                if confidence >= min_confidence and lift >= min_lift:
+                    stats.append(OrderedStatistic(base, add, confidence, lift))
+        if stats:
+            yield RelationRecord(items, support, stats)
+
+
+def _confidence_error(support: float, base_support: float, error: float) -> float:
+    """Worst-case confidence deviation when both supports may be off by +/- error."""
+    if error <= 0:
+        return 0.0
+    if base_support - error <= 0:
+        return 1.0
+    confidence = support / base_support
+    high = min(1.0, (support + error) / (base_support - error))
+    low = max(0.0, (support - error) / (base_support + error))
+    return max(high - confidence, confidence - low)
+
+
+def _resolve_jobs(n_jobs: Optional[int]) -> int:
+    """Worker count for a pool: 0 or None means one per core."""
+    return n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+
+
+def _count_candidates(transactions: List[List[str]], candidates: List[tuple], n_jobs: int = 1,
+                      chunk_size: int = 50000) -> List[int]:
+    """Count candidate occurrences over all transactions, chunk by chunk.
+
+    ``n_jobs`` follows ``fit``: 0 (or None) means one worker per core.
+    """
+    chunks = [(transactions[i:i + chunk_size], candidates) for i in range(0, len(transactions), chunk_size)]
+    n_jobs = _resolve_jobs(n_jobs)
+    totals = [0] * len(candidates)
+    if n_jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as pool:
+            results = list(pool.map(_count_partition, chunks))
+    else:
+        results = map(_count_partition, chunks)
+    for counts in results:
+        totals = [a + b for a, b in zip(totals, counts)]
+    return totals
+
+
+def _split(transactions: List[List[str]], n_partitions: int) -> List[List[List[str]]]:
+    size = -(-len(transactions) // n_partitions)
+    return [transactions[i:i + size] for i in range(0, len(transactions), size)]
 
 
 class AprioriEngine:
     def __init__(self):
         self.rules = []
         self.transactions: List[List[str]] = []
+        self.fit_stats: Dict[str, Any] = {}
+        self.rules_version = 0
+        # (rules, rule ids by base item, rule ids by added item, -confidence per rule)
+        self._rule_index = ([], {}, {}, [])
+        self._loader = RunOnce()
+
+    def set_loader(self, loader):
+        """Defer training: ``loader(engine)`` runs once, on the first ``ensure_fitted``."""
+        self._loader.set(loader)
+
+    def ensure_fitted(self):
+        self._loader.run(self)
+
+    def fit(self, transactions: List[List[str]], min_support: float = 0.02, min_confidence: float = 0.3, min_lift: float = 1.0,
+            n_jobs: int = 1, n_partitions: Optional[int] = None):
+        """Run apriori on transactions and cache rules.
 
-    def fit(self, transactions: List[List[str]], min_support: float = 0.02, min_confidence: float = 0.3, min_lift: float = 1.0):
-        """Run apriori on transactions and cache rules."""
+        With ``n_jobs > 1`` frequent itemsets are mined SON-style: each partition is
+        mined locally in a process pool and a second pass counts the union of local
+        itemsets over the full data. The rules are identical to the serial run.
+
+        Partitions are capped so each one still needs ``_MIN_LOCAL_COUNT``
+        occurrences to call an itemset frequent; when even two partitions would
+        go below that, the fit runs serially and ``fit_stats['fallback']`` says why.
+        ``n_jobs=0`` (or None) means one worker per core.
+        """
+        started = time.perf_counter()
         self.transactions = [list(map(lambda s: s.strip().lower(), t)) for t in transactions]
-        results = apriori(self.transactions, min_support=min_support, min_confidence=min_confidence, min_lift=min_lift)
-
-        rules = []
-        for record in results:
-            items = tuple(record.items)
-            support = float(record.support)
-            for stat in record.ordered_statistics:
-                base = tuple(stat.items_base)
-                add = tuple(stat.items_add)
-                confidence = float(stat.confidence)
-                lift = float(stat.lift)
-                rules.append({
-                    'base': list(base),
-                    'add': list(add),
-                    'support': support,
-                    'confidence': confidence,
-                    'lift': lift
-                })
+
+        n_jobs = _resolve_jobs(n_jobs)
+        requested_partitions = max(1, min(n_partitions or n_jobs, len(self.transactions)))
+        n_partitions, fallback = 1, None
+        if n_jobs > 1 and requested_partitions > 1:
+            if min_support <= 0:
+                raise ValueError('minimum support must be > 0')
+            max_partitions = int(min_support * len(self.transactions) // _MIN_LOCAL_COUNT)
+            n_partitions = min(requested_partitions, max_partitions)
+            if n_partitions < 2:
+                n_partitions = 1
+                fallback = (f'min_support {min_support} over {len(self.transactions)} transactions leaves fewer than '
+                            f'{_MIN_LOCAL_COUNT} occurrences per partition; mined serially')
+        if n_partitions < 2:
+            n_jobs = 1
+
+        if n_partitions > 1:
+            supports = self._parallel_supports(min_support, n_jobs, n_partitions)
+            rules = _rules_from_records(_relation_records(supports, min_confidence, min_lift))
+        else:
+            from apyori import apriori
+            rules = _rules_from_records(apriori(self.transactions, min_support=min_support,
+                                                min_confidence=min_confidence, min_lift=min_lift))
 
         # sort rules by confidence then lift
         rules.sort(key=lambda r: (r['confidence'], r['lift']), reverse=True)
-        self.rules = rules
+        self._set_rules(rules)
+        self.fit_stats = {
+            'mode': 'partitioned' if n_partitions > 1 else 'serial',
+            'n_jobs': n_jobs,
+            'n_partitions': n_partitions,
+            'requested_partitions': requested_partitions,
+            'fallback': fallback,
+            'transactions': len(self.transactions),
+            'rules': len(rules),
+            'seconds': time.perf_counter() - started,
+        }
         return rules
 
+    def _parallel_supports(self, min_support: float, n_jobs: int, n_partitions: int) -> Dict[frozenset, float]:
+        """Globally frequent itemsets and their exact supports."""
+        partitions = _split(self.transactions, n_partitions)
+        local_support = min_support * (1 - _LOCAL_SUPPORT_SLACK)
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # Phase 1: anything globally frequent is locally frequent in some partition
+            candidates = set()
+            for itemsets in pool.map(_mine_partition, [(p, local_support) for p in partitions]):
+                candidates.update(itemsets)
+            candidates = sorted(candidates, key=lambda c: (len(c), c))
+
+            # Phase 2: one counting pass over all partitions confirms global support
+            totals = [0] * len(candidates)
+            for counts in pool.map(_count_partition, [(p, candidates) for p in partitions]):
+                totals = [a + b for a, b in zip(totals, counts)]
+
+        n = float(len(self.transactions))
+        return {frozenset(candidate): count / n for candidate, count in zip(candidates, totals) if count / n >= min_support}
+
+    def fit_approximate(self, transactions: Iterable[List[str]], min_support: float = 0.02, min_confidence: float = 0.3,
+                        min_lift: float = 1.0, error: float = 0.005, delta: float = 0.05, verify: bool = True,
+                        seed: int = 0, n_jobs: int = 1):
+        """Mine rules from a random sample (Toivonen) instead of the full log.
+
+        ``error`` is the single accuracy/cost knob: the sample holds
+        ``ln(2 / delta) / (2 * error**2)`` transactions, so by Hoeffding any one
+        itemset's sampled support is within ``error`` of its true support with
+        probability ``1 - delta``. That is a per-itemset bound, not a union bound
+        over every candidate; a few itemsets near the threshold can still land
+        outside it. The sample is mined at ``min_support - error``.
+
+        ``transactions`` is read once and reservoir-sampled as it streams, so
+        without ``verify`` only the sample is held in memory; supports then come
+        from the sample and every rule carries ``support_error`` and
+        ``confidence_error`` bounds.
+
+        With ``verify`` the full log is kept for one more pass that counts the
+        sample's frequent itemsets and their negative border, so reported supports
+        and confidences are exact; ``fit_stats['exact']`` is False only when a
+        border itemset turned out frequent, i.e. some of its supersets may have been missed.
+        """
+        from apyori import gen_support_records, TransactionManager
+
+        started = time.perf_counter()
+        if not 0 < error < min_support:
+            raise ValueError('error must be > 0 and smaller than min_support')
+
+        sample_size = math.ceil(math.log(2 / delta) / (2 * error ** 2))
+        rng = random.Random(seed)
+        sample: List[List[str]] = []
+        full: List[List[str]] = []
+        items = set()
+        total = 0
+        for transaction in transactions:
+            transaction = [s.strip().lower() for s in transaction]
+            if verify:
+                full.append(transaction)
+                items.update(transaction)
+            if total < sample_size:
+                sample.append(transaction)
+            else:
+                slot = rng.randrange(total + 1)
+                if slot < sample_size:
+                    sample[slot] = transaction
+            total += 1
+        if total <= sample_size:
+            # the whole log fits in the sample, so its supports are exact
+            sample_size, error = total, 0.0
+        self.transactions = full if verify else sample
+        lowered_support = min_support - error
+
+        # Frequent itemsets of the sample at the lowered threshold, by length
+        sample_manager = TransactionManager(sample)
+        sample_supports = {r.items: r.support for r in gen_support_records(sample_manager, lowered_support)}
+
+        border_misses = 0
+        if verify and error > 0:
+            candidates = list(sample_supports) + self._negative_border(sample_supports, items)
+            counts = _count_candidates(full, [tuple(sorted(c)) for c in candidates], n_jobs)
+            n = float(total)
+            supports = {}
+            for candidate, count in zip(candidates, counts):
+                if count / n < min_support:
+                    continue
+                supports[candidate] = count / n
+                if candidate not in sample_supports:
+                    border_misses += 1
+            support_error = 0.0
+        else:
+            supports = {k: v for k, v in sample_supports.items() if v >= min_support}
+            support_error = error
+
+        rules = _rules_from_records(_relation_records(supports, min_confidence, min_lift))
+        for rule in rules:
+            rule['support_error'] = support_error
+            if rule['base']:
+                base_support = supports[frozenset(rule['base'])]
+                rule['confidence_error'] = _confidence_error(rule['support'], base_support, support_error)
+            else:
+                # empty base: confidence is the support itself
+                rule['confidence_error'] = support_error
+
+        rules.sort(key=lambda r: (r['confidence'], r['lift']), reverse=True)
+        self._set_rules(rules)
+        self.fit_stats = {
+            'mode': 'sampled',
+            'transactions': total,
+            'sample_size': sample_size,
+            'lowered_support': lowered_support,
+            'support_error': support_error,
+            'delta': delta,
+            'verified': verify,
+            'border_misses': border_misses,
+            'exact': support_error == 0 and border_misses == 0,
+            'rules': len(rules),
+            'seconds': time.perf_counter() - started,
+        }
+        return rules
+
+    @staticmethod
+    def _negative_border(frequent: Dict[frozenset, float], items: Iterable[str]) -> List[frozenset]:
+        """Minimal itemsets that are not frequent but whose subsets all are."""
+        from apyori import create_next_candidates
+
+        border = [frozenset([item]) for item in sorted(items) if frozenset([item]) not in frequent]
+        by_length: Dict[int, set] = {}
+        for itemset in frequent:
+            by_length.setdefault(len(itemset), set()).add(itemset)
+        for length in sorted(by_length):
+            for candidate in create_next_candidates(by_length[length], length + 1):
+                if candidate not in frequent:
+                    border.append(candidate)
+        return border
+
+    def _set_rules(self, rules: List[Dict[str, Any]]):
+        """Install a new rule list and rebuild the item -> rule id indexes used by query_rules."""
+        by_base: Dict[str, List[int]] = {}
+        by_add: Dict[str, List[int]] = {}
+        for rule_id, rule in enumerate(rules):
+            for item in rule['base']:
+                by_base.setdefault(item, []).append(rule_id)
+            for item in rule['add']:
+                by_add.setdefault(item, []).append(rule_id)
+        # rules are sorted by confidence desc, so a min_confidence filter is a prefix
+        self._rule_index = (rules, by_base, by_add, [-r['confidence'] for r in rules])
+        self.rules = rules
+        self.rules_version += 1
+
+    def query_rules(self, antecedent: Optional[str] = None, consequent: Optional[str] = None,
+                    min_support: float = 0.0, min_confidence: float = 0.0, min_lift: float = 0.0,
+                    after: int = -1):
+        """Yield ``(rule_id, rule)`` matching the filters, in rule order, with id > ``after``.
+
+        Item filters use the per-item indexes; min_confidence cuts the scan at the
+        first rule below it. Rule ids are only stable within one ``rules_version``.
+        """
+        rules, by_base, by_add, neg_confidence = self._rule_index
+        end = bisect.bisect_right(neg_confidence, -min_confidence) if min_confidence > 0 else len(rules)
+        candidates = None
+        for lookup, item in ((by_base, antecedent), (by_add, consequent)):
+            if item:
+                ids = lookup.get(item.strip().lower(), [])
+                candidates = ids if candidates is None else sorted(set(candidates) & set(ids))
+
+        if candidates is None:
+            ids = range(after + 1, end)
+        else:
+            ids = candidates[bisect.bisect_right(candidates, after):bisect.bisect_left(candidates, end)]
+        for rule_id in ids:
+            rule = rules[rule_id]
+            if rule['support'] >= min_support and rule['lift'] >= min_lift:
+                yield rule_id, rule
+
     def get_recommendations(self, item: str, top_n: int = 5, min_confidence: float = 0.2) -> List[Dict[str, Any]]:
         item_lower = item.strip().lower()
         recs = []
-        for r in self.rules:
-            if item_lower in r['base'] and r['confidence'] >= min_confidence:
+        rules, by_base, _, _ = self._rule_index
+        for r in (rules[i] for i in by_base.get(item_lower, [])):
+            if r['confidence'] >= min_confidence:
                 for add in r['add']:
                     recs.append({
                         'item': add,
@@ -7,8 +7,26 @@ class Config:
     """Base configuration"""
     DEBUG = False
     TESTING = False
-    DATABASE = 'shopping_assistant.db'
+    # SQLite file, or ':memory:' for a shared-cache in-memory database (no disk I/O)
+    DATABASE = os.getenv('DATABASE', 'shopping_assistant.db')
+    # Households: 1 gives each non-default household its own SQLite file under HOUSEHOLD_DB_DIR
+    SHARD_BY_HOUSEHOLD = os.getenv('SHARD_BY_HOUSEHOLD', '0') == '1'
+    HOUSEHOLD_DB_DIR = os.getenv('HOUSEHOLD_DB_DIR', 'households')
     GOOGLE_CLOUD_CREDENTIALS = os.getenv('GOOGLE_CLOUD_CREDENTIALS', '')
+    # Apriori mining: >1 worker enables partitioned (SON) mining, 0 means all cores
+    APRIORI_JOBS = int(os.getenv('APRIORI_JOBS', '1'))
+    APRIORI_PARTITIONS = int(os.getenv('APRIORI_PARTITIONS', '0')) or None
+    # Set to a support error (e.g. 0.0002) to mine a Toivonen sample instead of the full log
+    APRIORI_SAMPLE_ERROR = float(os.getenv('APRIORI_SAMPLE_ERROR', '0')) or None
+    # Purchase history write-behind buffer
+    HISTORY_WRITE_BEHIND = os.getenv('HISTORY_WRITE_BEHIND', '1') == '1'
+    HISTORY_FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL', '1.0'))
+    HISTORY_QUEUE_SIZE = int(os.getenv('HISTORY_QUEUE_SIZE', '10000'))
+    # Open SSE streams each hold a server thread; past this many new ones get a 503 (0 = no limit)
+    MAX_EVENT_STREAMS = int(os.getenv('MAX_EVENT_STREAMS', '16'))
+    # Train rules and build the name index on a background thread right after boot. Off by
+    # default: it loads pandas/numpy/scipy/apyori into every worker whether or not it needs them
+    WARM_START = os.getenv('WARM_START', '0') == '1'
     
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -22,6 +40,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DATABASE = ':memory:'
+    WARM_START = False
 
 config = {
     'development': DevelopmentConfig,
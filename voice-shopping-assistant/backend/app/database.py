@@ -1,11 +1,27 @@
+import itertools
+import json
+import os
 import sqlite3
-from contextlib import contextmanager
+import threading
+from datetime import datetime, timezone
+from contextlib import contextmanager, nullcontext
 from app.config import Config
+from app.tenancy import DEFAULT_HOUSEHOLD, is_valid_household
 
-DATABASE = Config.DATABASE
+def _tables(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {row[0] for row in cursor.fetchall()}
 
-def init_db():
-    conn = sqlite3.connect(DATABASE)
+def _columns(cursor, table):
+    cursor.execute(f'PRAGMA table_info({table})')
+    return {row[1] for row in cursor.fetchall()}
+
+def _add_household_column(cursor, table):
+    """Older databases predate households; their rows belong to the default household."""
+    if 'household_id' not in _columns(cursor, table):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN household_id TEXT NOT NULL DEFAULT '{DEFAULT_HOUSEHOLD}'")
+
+def _create_schema(conn):
     cursor = conn.cursor()
     # Table 1: Shopping List
     cursor.execute('''
@@ -30,30 +46,184 @@ def init_db():
             frequency INTEGER DEFAULT 1
         )
     ''')
+    # Table 3: Precomputed next-basket picks per member (JSON list, one row per member)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS member_recommendations (
+            member_number INTEGER PRIMARY KEY,
+            items TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Table 4: Append-only purchase events (one row per checked-off purchase)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS purchase_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_name TEXT NOT NULL,
+            category TEXT,
+            purchased_at TIMESTAMP NOT NULL
+        )
+    ''')
+    # Every household-owned table is keyed by household first so per-household queries stay index scans
+    for table in ('shopping_list', 'purchase_history', 'purchase_events'):
+        _add_household_column(cursor, table)
+    cursor.execute('DROP INDEX IF EXISTS idx_purchase_history_item')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_shopping_list_household ON shopping_list (household_id, completed)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_purchase_history_household_item ON purchase_history (household_id, item_name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_purchase_events_household_item '
+                   'ON purchase_events (household_id, item_name, purchased_at)')
+    # Table 5: Population repurchase intervals from the dataset, shared by all households
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_interval_priors (
+            item_name TEXT PRIMARY KEY,
+            interval_days REAL NOT NULL
+        )
+    ''')
+    # Table 6: Per-household repurchase-interval rollup, maintained incrementally per event
+    if 'item_intervals' in _tables(cursor) and 'household_id' not in _columns(cursor, 'item_intervals'):
+        # Pre-household rollup: keep its priors, rebuild the rest from the event log below
+        cursor.execute('''
+            INSERT OR REPLACE INTO item_interval_priors (item_name, interval_days)
+            SELECT item_name, prior_interval_days FROM item_intervals WHERE prior_interval_days IS NOT NULL
+        ''')
+        cursor.execute('DROP TABLE item_intervals')
+        rebuild_rollup = True
+    else:
+        rebuild_rollup = False
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_intervals (
+            household_id TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            category TEXT,
+            last_purchased_at TIMESTAMP,
+            purchase_count INTEGER DEFAULT 0,
+            interval_count INTEGER DEFAULT 0,
+            interval_days_total REAL DEFAULT 0,
+            PRIMARY KEY (household_id, item_name)
+        )
+    ''')
+    if rebuild_rollup:
+        cursor.execute('SELECT household_id, item_name, category, purchased_at FROM purchase_events ORDER BY purchased_at, id')
+        _fold_intervals(cursor, [tuple(row) for row in cursor.fetchall()])
     conn.commit()
-    conn.close()
+
+class Storage:
+    """Where get_db() connects, built from the active config.
+
+    ``database`` is a SQLite file path, or ``:memory:`` for a shared-cache
+    in-memory database: every connection opens the same named database and a
+    keep-alive connection stops SQLite from discarding it when the last
+    request's connection closes. Shared-cache connections fail instead of
+    waiting on each other's locks, so in-memory access is serialized with a
+    lock (it's one process and no disk, so that costs little).
+
+    Without sharding every household shares the main database. With
+    ``shard_by_household`` each non-default household gets its own database
+    (a file in ``household_db_dir``, or its own in-memory database); the
+    default household and the shared tables stay in the main one. Schemas are
+    created or migrated on first use.
+    """
+
+    _memory_ids = itertools.count(1)
+
+    def __init__(self, database, shard_by_household=False, household_db_dir='households'):
+        self.database = database
+        self.shard_by_household = shard_by_household
+        self.household_db_dir = household_db_dir
+        self.in_memory = database == ':memory:'
+        self._memory_name = f'shopping-{next(self._memory_ids)}' if self.in_memory else None
+        self._initialized = set()
+        self._keepalive = {}
+        self._schema_lock = threading.Lock()
+        self._memory_lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.DATABASE, config.SHARD_BY_HOUSEHOLD, config.HOUSEHOLD_DB_DIR)
+
+    def target(self, household=None):
+        """Connection string for a household's database."""
+        if not self.shard_by_household or household in (None, DEFAULT_HOUSEHOLD):
+            suffix = None
+        elif not is_valid_household(household):
+            raise ValueError(f"Invalid household id: {household!r}")
+        else:
+            suffix = household
+        if self.in_memory:
+            name = f'{self._memory_name}-{suffix}' if suffix else self._memory_name
+            return f'file:{name}?mode=memory&cache=shared'
+        return os.path.join(self.household_db_dir, f'{suffix}.db') if suffix else self.database
+
+    def _open(self, target, **kwargs):
+        return sqlite3.connect(target, uri=self.in_memory, **kwargs)
+
+    def init(self, household=None):
+        target = self.target(household)
+        if target in self._initialized:
+            return target
+        with self._schema_lock:
+            if target not in self._initialized:
+                if self.in_memory:
+                    self._keepalive[target] = self._open(target, check_same_thread=False)
+                elif target != self.database:
+                    os.makedirs(self.household_db_dir, exist_ok=True)
+                conn = self._open(target)
+                try:
+                    _create_schema(conn)
+                finally:
+                    conn.close()
+                self._initialized.add(target)
+        return target
+
+    @contextmanager
+    def connect(self, household=None):
+        target = self.init(household)
+        with self._memory_lock if self.in_memory else nullcontext():
+            conn = self._open(target)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def close(self):
+        """Drop in-memory databases (file databases are left as they are)."""
+        with self._schema_lock:
+            for conn in self._keepalive.values():
+                conn.close()
+            self._keepalive.clear()
+            self._initialized.clear()
+
+
+storage = Storage.from_config(Config)
+
+def configure_storage(config):
+    """Point get_db() at the database described by ``config`` (e.g. ``config[env]`` from run.py)."""
+    global storage
+    previous, storage = storage, Storage.from_config(config)
+    previous.close()
+    return storage
+
+def init_db():
+    storage.init()
 
 @contextmanager
-def get_db():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
-def add_shopping_item(item_name, category, quantity=1):
-    with get_db() as conn:
+def get_db(household=None):
+    with storage.connect(household) as conn:
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def add_shopping_item(item_name, category, quantity=1, *, household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
         cursor = conn.cursor()
         # Check if item already exists
         cursor.execute('''
             SELECT id, quantity FROM shopping_list 
-            WHERE LOWER(item_name) = LOWER(?) AND completed = 0
-        ''', (item_name.strip(),))
+            WHERE household_id = ? AND LOWER(item_name) = LOWER(?) AND completed = 0
+        ''', (household, item_name.strip()))
         existing = cursor.fetchone()
         
         if existing:
@@ -66,47 +236,182 @@ def add_shopping_item(item_name, category, quantity=1):
         else:
             # Insert new item
             cursor.execute('''
-                INSERT INTO shopping_list (item_name, category, quantity)
-                VALUES (?, ?, ?)
-            ''', (item_name.strip(), category, quantity))
+                INSERT INTO shopping_list (household_id, item_name, category, quantity)
+                VALUES (?, ?, ?, ?)
+            ''', (household, item_name.strip(), category, quantity))
             return cursor.lastrowid
 
-def get_shopping_list():
-    with get_db() as conn:
+def get_shopping_list(household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM shopping_list WHERE completed = 0')
+        cursor.execute('SELECT * FROM shopping_list WHERE household_id = ? AND completed = 0', (household,))
         return [dict(row) for row in cursor.fetchall()]
 
-def remove_shopping_item(item_id):
-    with get_db() as conn:
+def remove_shopping_item(item_id, *, household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
         cursor = conn.cursor()
-        cursor.execute('DELETE FROM shopping_list WHERE id = ?', (item_id,))
+        cursor.execute('DELETE FROM shopping_list WHERE id = ? AND household_id = ?', (item_id, household))
         return cursor.rowcount > 0
 
-def remove_item_by_name(item_name):
-    with get_db() as conn:
+def remove_item_by_name(item_name, *, household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
         cursor = conn.cursor()
-        cursor.execute('DELETE FROM shopping_list WHERE LOWER(item_name) = LOWER(?)', (item_name.strip(),))
+        cursor.execute('DELETE FROM shopping_list WHERE household_id = ? AND LOWER(item_name) = LOWER(?)',
+                       (household, item_name.strip()))
         return cursor.rowcount > 0
 
-def mark_item_complete(item_id):
-    with get_db() as conn:
+def mark_item_complete(item_id, *, household=DEFAULT_HOUSEHOLD):
+    """Check an open item off; False if the household has no such open item (e.g. it's already completed)."""
+    with get_db(household) as conn:
         cursor = conn.cursor()
-        cursor.execute('UPDATE shopping_list SET completed = 1 WHERE id = ?', (item_id,))
+        cursor.execute('UPDATE shopping_list SET completed = 1 WHERE id = ? AND household_id = ? AND completed = 0',
+                       (item_id, household))
         return cursor.rowcount > 0
 
-def add_to_history(item_name, category):
+def update_item_quantity(item_id, quantity, *, household=DEFAULT_HOUSEHOLD):
+    """Set an item's quantity; returns the updated row or None if the household has no such item."""
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.execute('UPDATE shopping_list SET quantity = ? WHERE id = ? AND household_id = ?',
+                       (quantity, item_id, household))
+        cursor.execute('SELECT * FROM shopping_list WHERE id = ? AND household_id = ?', (item_id, household))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+def get_shopping_item(item_id, *, household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM shopping_list WHERE id = ? AND household_id = ?', (item_id, household))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+def add_to_history(item_name, category, purchased_at=None, *, household=DEFAULT_HOUSEHOLD):
+    purchased_at = purchased_at or datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    write_history_batch({(item_name, category): 1}, [(item_name, category, purchased_at)], household=household)
+
+def write_history_batch(increments, events, *, household=DEFAULT_HOUSEHOLD):
+    """Apply coalesced purchase_history increments and append their events in one transaction.
+
+    ``increments`` maps (item_name, category) to the number of purchases.
+    """
+    rows = [(name, category, count) for (name, category), count in increments.items()]
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO purchase_history (household_id, item_name, category, frequency)
+            SELECT ?, ?, ?, 0
+            WHERE NOT EXISTS (SELECT 1 FROM purchase_history WHERE household_id = ? AND item_name = ?)
+        ''', [(household, name, category, household, name) for name, category, _ in rows])
+        cursor.executemany('UPDATE purchase_history SET frequency = frequency + ? WHERE household_id = ? AND item_name = ?',
+                           [(count, household, name) for name, _, count in rows])
+        record_purchase_events(cursor, [(household,) + tuple(event) for event in events])
+
+def record_purchase_events(cursor, events):
+    """Append (household_id, item_name, category, purchased_at) events and fold them into item_intervals."""
+    cursor.executemany('''
+        INSERT INTO purchase_events (household_id, item_name, category, purchased_at) VALUES (?, ?, ?, ?)
+    ''', events)
+    _fold_intervals(cursor, events)
+
+def _fold_intervals(cursor, events):
+    """Update the per-household rollup, counting intervals in calendar days.
+
+    A repeat purchase on the same date adds no interval; one on a later date adds
+    the number of dates between them, whatever the time of day. Events are folded
+    oldest first; one older than the item's last purchase (a late batch) only
+    bumps purchase_count.
+    """
+    day_gap = 'COALESCE(julianday(date(excluded.last_purchased_at)) - julianday(date(item_intervals.last_purchased_at)), 0)'
+    cursor.executemany(f'''
+        INSERT INTO item_intervals (household_id, item_name, category, last_purchased_at, purchase_count)
+        VALUES (?, ?, ?, ?, 1)
+        ON CONFLICT(household_id, item_name) DO UPDATE SET
+            category = COALESCE(item_intervals.category, excluded.category),
+            interval_count = interval_count + ({day_gap} >= 1),
+            interval_days_total = interval_days_total + {day_gap} * ({day_gap} >= 1),
+            purchase_count = purchase_count + 1,
+            last_purchased_at = MAX(COALESCE(item_intervals.last_purchased_at, ''), excluded.last_purchased_at)
+    ''', [(household, name.lower(), category, at)
+          for household, name, category, at in sorted(events, key=lambda event: event[3])])
+
+def save_repurchase_priors(priors):
+    """Store population repurchase intervals as (item_name, interval_days) rows."""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT id, frequency FROM purchase_history WHERE item_name = ?', (item_name,))
-        existing = cursor.fetchone()
-        if existing:
-            cursor.execute('UPDATE purchase_history SET frequency = frequency + 1 WHERE id = ?', (existing['id'],))
-        else:
-            cursor.execute('INSERT INTO purchase_history (item_name, category) VALUES (?, ?)', (item_name, category))
+        cursor.executemany('''
+            INSERT INTO item_interval_priors (item_name, interval_days) VALUES (?, ?)
+            ON CONFLICT(item_name) DO UPDATE SET interval_days = excluded.interval_days
+        ''', [(name.lower(), float(days)) for name, days in priors])
+        return cursor.rowcount
+
+def get_due_items(now=None, limit=10, *, household=DEFAULT_HOUSEHOLD):
+    """Items whose time since last purchase has reached their typical repurchase interval.
+
+    A household's own average interval wins; the population prior covers items
+    it has only bought once. Priors live in the shared database, so the two are
+    merged here rather than joined (a sharded household has its own database).
+    """
+    now = now or datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT item_name, category, last_purchased_at,
+                   CASE WHEN interval_count > 0 THEN interval_days_total / interval_count END AS interval_days,
+                   julianday(?) - julianday(last_purchased_at) AS days_since
+            FROM item_intervals
+            WHERE household_id = ? AND last_purchased_at IS NOT NULL
+        ''', (now, household))
+        rows = [dict(row) for row in cursor.fetchall()]
+
+    missing = [row['item_name'] for row in rows if row['interval_days'] is None]
+    if missing:
+        priors = {}
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                cursor.execute(f'''
+                    SELECT item_name, interval_days FROM item_interval_priors
+                    WHERE item_name IN ({','.join('?' * len(chunk))})
+                ''', chunk)
+                priors.update((row['item_name'], row['interval_days']) for row in cursor.fetchall())
+        for row in rows:
+            if row['interval_days'] is None:
+                row['interval_days'] = priors.get(row['item_name'])
+
+    due = [row for row in rows if row['interval_days'] and row['days_since'] >= row['interval_days']]
+    due.sort(key=lambda row: row['days_since'] / row['interval_days'], reverse=True)
+    return due[:limit]
+
+def get_history_item_names(household):
+    """(item_name, frequency) pairs from one household's purchase history."""
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT item_name, SUM(frequency) AS frequency FROM purchase_history
+            WHERE household_id = ? GROUP BY item_name
+        ''', (household,))
+        return [(row['item_name'], row['frequency']) for row in cursor.fetchall()]
+
+def get_purchase_history(household=DEFAULT_HOUSEHOLD):
+    with get_db(household) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM purchase_history WHERE household_id = ? ORDER BY frequency DESC LIMIT 20
+        ''', (household,))
+        return [dict(row) for row in cursor.fetchall()]
+
+def save_member_recommendations(rows):
+    """Replace the member recommendation table with (member_number, items_json) rows."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM member_recommendations')
+        cursor.executemany('INSERT INTO member_recommendations (member_number, items) VALUES (?, ?)', rows)
+        return cursor.rowcount
 
-def get_purchase_history():
+def get_member_recommendations(member_number):
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM purchase_history ORDER BY frequency DESC LIMIT 20')
-        return [dict(row) for row in cursor.fetchall()]
\ No newline at end of file
+        cursor.execute('SELECT items FROM member_recommendations WHERE member_number = ?', (member_number,))
+        row = cursor.fetchone()
+        return json.loads(row['items']) if row else None
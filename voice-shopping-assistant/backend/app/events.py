@@ -0,0 +1,176 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set
+
+from app.config import Config
+from app.tenancy import DEFAULT_HOUSEHOLD
+
+
+class StreamLimitReached(Exception):
+    """Raised by ``ChangeFeed.subscribe`` when ``max_streams`` streams are already open."""
+
+
+class ChangeFeed:
+    """In-process publish/subscribe feed behind the SSE endpoint.
+
+    Every event gets an increasing id and is kept in a short backlog, so a
+    client that reconnects with ``Last-Event-ID`` gets what it missed. Each
+    subscriber has its own bounded queue; a subscriber that falls that far
+    behind is dropped and has to reconnect (and replay) instead of letting
+    memory grow. Subscribers only see events published by the same process,
+    so run a single worker process (with threads) when clients share lists.
+    Events and subscribers belong to a household; a subscriber only receives
+    (and replays) its own household's events, but ids are global.
+
+    Each open stream holds a server thread for as long as the client stays
+    connected, so at most ``max_streams`` (0 for no limit) may be open at once;
+    past that ``subscribe`` raises ``StreamLimitReached`` and the remaining
+    threads stay free for ordinary requests.
+    """
+
+    def __init__(self, backlog: int = 500, max_pending: int = 1000, max_streams: int = 0):
+        self.max_pending = max_pending
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._backlog = deque(maxlen=backlog)
+        self._subscribers: Dict[queue.Queue, str] = {}
+        self._next_id = 1
+
+    def publish(self, event: str, data: Dict, household: str = DEFAULT_HOUSEHOLD) -> int:
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            message = (event_id, event, data)
+            self._backlog.append((household, message))
+            for subscriber, subscribed_household in list(self._subscribers.items()):
+                if subscribed_household != household:
+                    continue
+                if subscriber.qsize() >= self.max_pending:
+                    # The extra queue slot is reserved for this sentinel
+                    del self._subscribers[subscriber]
+                    subscriber.put_nowait(None)
+                else:
+                    subscriber.put_nowait(message)
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[int] = None, household: str = DEFAULT_HOUSEHOLD) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_pending + 1)
+        with self._lock:
+            if self.max_streams and len(self._subscribers) >= self.max_streams:
+                raise StreamLimitReached(f'{self.max_streams} event streams already open')
+            if last_event_id is not None:
+                replay = [m for h, m in self._backlog if h == household and m[0] > last_event_id]
+                for message in replay[-self.max_pending:]:
+                    subscriber.put_nowait(message)
+            self._subscribers[subscriber] = household
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.pop(subscriber, None)
+
+    def stream(self, last_event_id: Optional[int] = None, keepalive: float = 15.0,
+               household: str = DEFAULT_HOUSEHOLD):
+        """Yield server-sent event frames until the client goes away."""
+        return self.frames(self.subscribe(last_event_id, household), keepalive)
+
+    def frames(self, subscriber: queue.Queue, keepalive: float = 15.0):
+        """Server-sent event frames for an existing subscription; unsubscribes when done."""
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    message = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    # Dropped for falling behind; the client reconnects and replays
+                    return
+                event_id, event, data = message
+                yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def _diff_suggestions(previous: Dict[str, Dict], current: List[Dict]) -> Dict:
+    current_by_item = {s['item'].lower(): s for s in current}
+    return {
+        'added': [s for key, s in current_by_item.items() if previous.get(key) != s],
+        'removed': [previous[key]['item'] for key in previous if key not in current_by_item],
+        'order': [s['item'] for s in current],
+    }
+
+
+class SuggestionPublisher:
+    """Recompute suggestions once per burst of changes and publish only the delta.
+
+    ``notify`` is cheap and can be called from request threads; a background
+    thread waits ``debounce`` seconds so a burst of list edits costs a single
+    recomputation per household, then publishes a ``suggestions`` event with
+    the added or changed suggestions, the removed item names and the new order.
+    """
+
+    def __init__(self, feed: ChangeFeed, compute: Callable[[str], List[Dict]], debounce: float = 0.2):
+        self.feed = feed
+        self.compute = compute
+        self.debounce = debounce
+        self._pending = threading.Event()
+        self._pending_households: Set[str] = set()
+        self._households_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._last: Dict[str, Dict[str, Dict]] = {}
+        self._last_order: Dict[str, List[str]] = {}
+
+    def notify(self, *households: str):
+        """Schedule a recomputation for the given households (the default one if none are given)."""
+        with self._households_lock:
+            self._pending_households.update(households or (DEFAULT_HOUSEHOLD,))
+        self._pending.set()
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='suggestion-publisher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            time.sleep(self.debounce)
+            self._pending.clear()
+            with self._households_lock:
+                households, self._pending_households = self._pending_households, set()
+            for household in households:
+                try:
+                    self.publish_delta(household)
+                except Exception as e:
+                    print(f"Warning: could not publish suggestion update for {household}: {e}")
+
+    def publish_delta(self, household: str = DEFAULT_HOUSEHOLD) -> Optional[int]:
+        current = self.compute(household)
+        delta = _diff_suggestions(self._last.get(household, {}), current)
+        changed = delta['added'] or delta['removed'] or delta['order'] != self._last_order.get(household, [])
+        self._last[household] = {s['item'].lower(): s for s in current}
+        self._last_order[household] = delta['order']
+        return self.feed.publish('suggestions', delta, household) if changed else None
+
+
+def _compute_suggestions(household: str) -> List[Dict]:
+    from app.routes.suggestion_routes import collect_suggestions
+    return collect_suggestions(household)
+
+
+# Global feed, reconfigured by create_app for the active config
+change_feed = ChangeFeed(max_streams=Config.MAX_EVENT_STREAMS)
+suggestion_publisher = SuggestionPublisher(change_feed, _compute_suggestions)
+
+
+def publish_list_change(event: str, data: Dict, household: str = DEFAULT_HOUSEHOLD) -> int:
+    """Publish a shopping-list mutation and schedule the matching suggestion update."""
+    event_id = change_feed.publish(event, data, household)
+    suggestion_publisher.notify(household)
+    return event_id
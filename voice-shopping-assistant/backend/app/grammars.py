@@ -0,0 +1,373 @@
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+# Command grammars per language. Each grammar lists the phrases the parser
+# understands; it is compiled into regexes the first time that language is
+# parsed. Units map every spoken form to one canonical (English) unit, and
+# categories use the same names as the English catalog so the rest of the
+# app doesn't care which language an item was added in.
+# 'spaced': False is for languages written without spaces (Japanese,
+# Chinese), where phrases match anywhere instead of on word boundaries and a
+# number word only counts when a counter follows it. 'elisions' are
+# contracted articles split off their word first ("l'eau" -> "l' eau").
+# 'articles' are dropped like fillers, except right before a unit, where they
+# mean one of it ("a gallon of milk").
+GRAMMARS: Dict[str, Dict] = {
+    'en': {
+        'add': ['add', 'buy', 'get', 'need', 'want', 'put', 'grab'],
+        'remove': ['remove', 'delete', 'discard', 'skip', 'cancel', 'don\'t need'],
+        'fillers': ['please', 'to my list', 'from my list', 'on my list', 'my list', 'the', 'of',
+                    'some', 'i', 'i\'d like', 'we', 'to', 'from', 'list'],
+        'articles': ['a', 'an'],
+        'numbers': {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+                    'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'dozen': 12, 'half': 0.5, 'couple': 2},
+        'units': {
+            'bottle': ['bottle', 'bottles'],
+            'liter': ['liter', 'liters', 'litre', 'litres', 'l'],
+            'kg': ['kg', 'kgs', 'kilo', 'kilos', 'kilogram', 'kilograms'],
+            'gram': ['gram', 'grams', 'g'],
+            'pound': ['pound', 'pounds', 'lb', 'lbs'],
+            'gallon': ['gallon', 'gallons'],
+            'pack': ['pack', 'packs', 'packet', 'packets'],
+            'box': ['box', 'boxes'],
+            'can': ['can', 'cans'],
+            'bag': ['bag', 'bags'],
+            'carton': ['carton', 'cartons'],
+            'jar': ['jar', 'jars'],
+            'loaf': ['loaf', 'loaves'],
+            'bunch': ['bunch', 'bunches'],
+            'piece': ['piece', 'pieces'],
+        },
+        'categories': {
+            'dairy': ['milk', 'cheese', 'yogurt', 'butter', 'cream'],
+            'produce': ['apple', 'banana', 'orange', 'carrot', 'broccoli', 'lettuce', 'tomato'],
+            'meat': ['chicken', 'beef', 'pork', 'fish', 'sausage'],
+            'snacks': ['chips', 'cookies', 'popcorn', 'nuts', 'candy'],
+            'beverages': ['water', 'juice', 'soda', 'coffee', 'tea'],
+            'pantry': ['bread', 'rice', 'pasta', 'cereal', 'rolls'],
+        },
+    },
+    'es': {
+        'add': ['añade', 'añadir', 'agrega', 'agregar', 'compra', 'comprar', 'necesito', 'quiero', 'pon', 'trae'],
+        'remove': ['quita', 'quitar', 'elimina', 'eliminar', 'borra', 'borrar', 'cancela', 'no necesito'],
+        'fillers': ['por favor', 'a mi lista', 'de mi lista', 'en mi lista', 'mi lista', 'lista', 'el', 'la', 'los',
+                    'las', 'de', 'del', 'unos', 'unas', 'a', 'en'],
+        'numbers': {'uno': 1, 'una': 1, 'un': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5, 'seis': 6,
+                    'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10, 'doce': 12, 'docena': 12, 'media': 0.5},
+        'units': {
+            'bottle': ['botella', 'botellas'],
+            'liter': ['litro', 'litros', 'l'],
+            'kg': ['kilo', 'kilos', 'kilogramo', 'kilogramos', 'kg'],
+            'gram': ['gramo', 'gramos', 'g'],
+            'pack': ['paquete', 'paquetes'],
+            'box': ['caja', 'cajas'],
+            'can': ['lata', 'latas'],
+            'bag': ['bolsa', 'bolsas'],
+        },
+        'categories': {
+            'dairy': ['leche', 'queso', 'yogur', 'mantequilla', 'crema', 'nata'],
+            'produce': ['manzana', 'plátano', 'banana', 'naranja', 'zanahoria', 'brócoli', 'lechuga', 'tomate'],
+            'meat': ['pollo', 'carne', 'cerdo', 'pescado', 'salchicha'],
+            'snacks': ['patatas fritas', 'papas fritas', 'galletas', 'palomitas', 'nueces', 'dulces'],
+            'beverages': ['agua', 'jugo', 'zumo', 'refresco', 'café', 'té'],
+            'pantry': ['pan', 'arroz', 'pasta', 'cereal'],
+        },
+    },
+    'fr': {
+        'elisions': ["l'", "d'", "j'"],
+        'add': ['ajoute', 'ajouter', 'achète', 'acheter', 'prends', 'prendre', 'il me faut', 'j\' ai besoin de',
+                'mets'],
+        'remove': ['enlève', 'enlever', 'supprime', 'supprimer', 'retire', 'retirer', 'annule',
+                   'pas besoin de'],
+        'fillers': ['s\'il te plaît', 's\'il vous plaît', 'à ma liste', 'de ma liste', 'sur ma liste', 'ma liste',
+                    'liste', 'le', 'la', 'les', 'l\'', 'de', 'du', 'des', 'd\'', 'j\'', 'à'],
+        'numbers': {'un': 1, 'une': 1, 'deux': 2, 'trois': 3, 'quatre': 4, 'cinq': 5, 'six': 6, 'sept': 7,
+                    'huit': 8, 'neuf': 9, 'dix': 10, 'douze': 12, 'douzaine': 12, 'demi': 0.5},
+        'units': {
+            'bottle': ['bouteille', 'bouteilles'],
+            'liter': ['litre', 'litres', 'l'],
+            'kg': ['kilo', 'kilos', 'kilogramme', 'kilogrammes', 'kg'],
+            'gram': ['gramme', 'grammes', 'g'],
+            'pack': ['paquet', 'paquets'],
+            'box': ['boîte', 'boîtes'],
+            'can': ['canette', 'canettes'],
+            'bag': ['sac', 'sacs', 'sachet', 'sachets'],
+        },
+        'categories': {
+            'dairy': ['lait', 'fromage', 'yaourt', 'beurre', 'crème'],
+            'produce': ['pomme', 'banane', 'orange', 'carotte', 'brocoli', 'laitue', 'salade', 'tomate'],
+            'meat': ['poulet', 'bœuf', 'boeuf', 'porc', 'poisson', 'saucisse'],
+            'snacks': ['chips', 'biscuits', 'popcorn', 'noix', 'bonbons'],
+            'beverages': ['eau', 'jus', 'soda', 'café', 'thé'],
+            'pantry': ['pain', 'riz', 'pâtes', 'céréales'],
+        },
+    },
+    'de': {
+        'add': ['füge', 'hinzufügen', 'hinzu', 'kaufe', 'kaufen', 'ich brauche', 'brauche', 'nimm', 'hol'],
+        'remove': ['entferne', 'entfernen', 'lösche', 'löschen', 'streiche', 'streichen', 'brauche kein',
+                   'brauche keine', 'ich brauche kein', 'ich brauche keine'],
+        'fillers': ['bitte', 'zur liste', 'zu meiner liste', 'auf die liste', 'von der liste', 'von meiner liste',
+                    'aus der liste', 'liste', 'der', 'die', 'das', 'den', 'zu', 'von', 'auf'],
+        'numbers': {'ein': 1, 'eine': 1, 'einen': 1, 'zwei': 2, 'drei': 3, 'vier': 4, 'fünf': 5, 'sechs': 6,
+                    'sieben': 7, 'acht': 8, 'neun': 9, 'zehn': 10, 'zwölf': 12, 'dutzend': 12, 'halbe': 0.5},
+        'units': {
+            'bottle': ['flasche', 'flaschen'],
+            'liter': ['liter', 'l'],
+            'kg': ['kilo', 'kilogramm', 'kg'],
+            'gram': ['gramm', 'g'],
+            'pack': ['packung', 'packungen', 'päckchen'],
+            'can': ['dose', 'dosen'],
+            'bag': ['tüte', 'tüten', 'beutel'],
+            'carton': ['karton', 'kartons'],
+        },
+        'categories': {
+            'dairy': ['milch', 'käse', 'joghurt', 'butter', 'sahne'],
+            'produce': ['apfel', 'äpfel', 'banane', 'orange', 'karotte', 'möhre', 'brokkoli', 'salat', 'tomate'],
+            'meat': ['hähnchen', 'huhn', 'rind', 'schwein', 'fisch', 'wurst'],
+            'snacks': ['chips', 'kekse', 'popcorn', 'nüsse', 'süßigkeiten'],
+            'beverages': ['wasser', 'saft', 'limo', 'kaffee', 'tee'],
+            'pantry': ['brot', 'brötchen', 'reis', 'nudeln', 'müsli'],
+        },
+    },
+    'it': {
+        'elisions': ["l'", "d'", "dell'"],
+        'add': ['aggiungi', 'aggiungere', 'compra', 'comprare', 'prendi', 'mi serve', 'mi servono',
+                'ho bisogno di', 'metti'],
+        'remove': ['rimuovi', 'togli', 'elimina', 'cancella', 'non mi serve', 'non mi servono'],
+        'fillers': ['per favore', 'alla mia lista', 'dalla mia lista', 'alla lista', 'dalla lista', 'lista',
+                    'il', 'lo', 'la', 'i', 'gli', 'le', 'l\'', 'd\'', 'dell\'', 'di', 'del', 'della', 'dei', 'delle'],
+        'numbers': {'uno': 1, 'una': 1, 'un': 1, 'due': 2, 'tre': 3, 'quattro': 4, 'cinque': 5, 'sei': 6,
+                    'sette': 7, 'otto': 8, 'nove': 9, 'dieci': 10, 'dodici': 12, 'dozzina': 12, 'mezzo': 0.5},
+        'units': {
+            'bottle': ['bottiglia', 'bottiglie'],
+            'liter': ['litro', 'litri', 'l'],
+            'kg': ['chilo', 'chili', 'kilo', 'kg'],
+            'gram': ['grammo', 'grammi', 'g'],
+            'pack': ['pacco', 'pacchi', 'confezione', 'confezioni'],
+            'box': ['scatola', 'scatole'],
+            'can': ['lattina', 'lattine'],
+            'bag': ['busta', 'buste', 'sacchetto', 'sacchetti'],
+        },
+        'categories': {
+            'dairy': ['latte', 'formaggio', 'yogurt', 'burro', 'panna'],
+            'produce': ['mela', 'mele', 'banana', 'arancia', 'carota', 'broccoli', 'lattuga', 'pomodoro', 'pomodori'],
+            'meat': ['pollo', 'manzo', 'maiale', 'pesce', 'salsiccia'],
+            'snacks': ['patatine', 'biscotti', 'popcorn', 'noci', 'caramelle'],
+            'beverages': ['acqua', 'succo', 'bibita', 'caffè', 'tè'],
+            'pantry': ['pane', 'riso', 'pasta', 'cereali'],
+        },
+    },
+    # Hindi transcripts come back in Devanagari or romanized (Hinglish), so both are listed
+    'hi': {
+        'add': ['add', 'add karo', 'add kar do', 'daalo', 'dalo', 'daal do', 'chahiye', 'lena hai', 'le aana',
+                'kharido', 'जोड़ो', 'जोड़ दो', 'डालो', 'डाल दो', 'चाहिए', 'लेना है', 'खरीदो'],
+        'remove': ['remove', 'hatao', 'hata do', 'nikalo', 'nikal do', 'mat lena', 'nahi chahiye',
+                   'हटाओ', 'हटा दो', 'निकालो', 'निकाल दो', 'मत लेना', 'नहीं चाहिए'],
+        'fillers': ['please', 'kripya', 'karo', 'kar do', 'kardo', 'list', 'mein', 'me', 'se', 'meri', 'ko',
+                    'कृपया', 'करो', 'कर दो', 'लिस्ट', 'सूची', 'में', 'से', 'मेरी', 'को'],
+        'numbers': {'ek': 1, 'do': 2, 'teen': 3, 'char': 4, 'chaar': 4, 'paanch': 5, 'panch': 5, 'chhe': 6,
+                    'saat': 7, 'aath': 8, 'nau': 9, 'das': 10, 'barah': 12, 'darjan': 12, 'aadha': 0.5,
+                    'dedh': 1.5, 'dhai': 2.5,
+                    'एक': 1, 'दो': 2, 'तीन': 3, 'चार': 4, 'पांच': 5, 'पाँच': 5, 'छह': 6, 'सात': 7, 'आठ': 8,
+                    'नौ': 9, 'दस': 10, 'बारह': 12, 'दर्जन': 12, 'आधा': 0.5, 'डेढ़': 1.5, 'ढाई': 2.5},
+        'units': {
+            'bottle': ['bottle', 'botal', 'बोतल'],
+            'liter': ['litre', 'liter', 'लीटर'],
+            'kg': ['kilo', 'kg', 'किलो'],
+            'gram': ['gram', 'ग्राम'],
+            'pack': ['packet', 'पैकेट'],
+            'box': ['dabba', 'डब्बा', 'डिब्बा'],
+        },
+        'categories': {
+            'dairy': ['doodh', 'dudh', 'paneer', 'dahi', 'makhan', 'malai', 'दूध', 'पनीर', 'दही', 'मक्खन'],
+            'produce': ['seb', 'kela', 'kele', 'santra', 'gajar', 'tamatar', 'pyaaz', 'aloo',
+                        'सेब', 'केला', 'केले', 'संतरा', 'गाजर', 'टमाटर', 'प्याज', 'आलू'],
+            'meat': ['chicken', 'murga', 'gosht', 'machli', 'मुर्गा', 'चिकन', 'गोश्त', 'मछली'],
+            'snacks': ['namkeen', 'biscuit', 'chips', 'नमकीन', 'बिस्कुट'],
+            'beverages': ['paani', 'pani', 'chai', 'coffee', 'juice', 'पानी', 'चाय', 'कॉफी', 'जूस'],
+            'pantry': ['chawal', 'aata', 'atta', 'dal', 'roti', 'bread', 'चावल', 'आटा', 'दाल', 'ब्रेड'],
+        },
+    },
+    'ja': {
+        'spaced': False,
+        'add': ['追加して', '追加', '買って', '買う', '入れて', 'ほしい'],
+        'remove': ['削除して', '削除', '消して', 'いらない', '取り消して'],
+        'fillers': ['お願いします', 'ください', 'リストに', 'リストから', 'リスト', 'を'],
+        'numbers': {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9, '十': 10},
+        'units': {
+            'bottle': ['本'],
+            'liter': ['リットル'],
+            'kg': ['キロ'],
+            'gram': ['グラム'],
+            'pack': ['パック'],
+            'box': ['箱'],
+            'can': ['缶'],
+            'bag': ['袋'],
+            'piece': ['個', 'つ'],
+        },
+        'categories': {
+            'dairy': ['牛乳', 'ミルク', 'チーズ', 'ヨーグルト', 'バター'],
+            'produce': ['りんご', 'リンゴ', 'バナナ', 'オレンジ', 'にんじん', 'トマト', 'レタス'],
+            'meat': ['鶏肉', '牛肉', '豚肉', '魚', 'ソーセージ'],
+            'snacks': ['ポテトチップス', 'クッキー', 'お菓子'],
+            'beverages': ['水', 'ジュース', 'コーヒー', 'お茶', '紅茶'],
+            'pantry': ['パン', '米', 'ご飯', 'パスタ'],
+        },
+    },
+    'zh': {
+        'spaced': False,
+        'add': ['添加', '加上', '买', '要', '加'],
+        'remove': ['删除', '去掉', '移除', '不要'],
+        'fillers': ['请', '到清单', '从清单', '清单', '购物', '把', '一下'],
+        'numbers': {'一': 1, '两': 2, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+                    '十': 10},
+        'units': {
+            'bottle': ['瓶'],
+            'liter': ['公升', '升'],
+            'kg': ['公斤'],
+            'gram': ['克'],
+            'pack': ['包'],
+            'box': ['盒'],
+            'can': ['罐'],
+            'bag': ['袋'],
+            'piece': ['个'],
+        },
+        'categories': {
+            'dairy': ['牛奶', '奶酪', '酸奶', '黄油'],
+            'produce': ['苹果', '香蕉', '橙子', '胡萝卜', '西红柿', '番茄', '生菜'],
+            'meat': ['鸡肉', '牛肉', '猪肉', '鱼', '香肠'],
+            'snacks': ['薯片', '饼干', '零食', '坚果'],
+            'beverages': ['水', '果汁', '咖啡', '茶', '汽水'],
+            'pantry': ['面包', '米饭', '大米', '面条'],
+        },
+    },
+}
+
+DEFAULT_LANGUAGE = 'en'
+
+# Punctuation that separates words; dots and commas between digits are decimals
+_PUNCTUATION = re.compile(r'(?<!\d)[.,](?!\d)|[!?;:¡¿"“”«»()。、，！？]')
+
+
+def _alternation(phrases) -> str:
+    # Longest first, so "don't need" wins over "need" and "kar do" over "do"
+    return '|'.join(re.escape(p) for p in sorted(set(phrases), key=len, reverse=True))
+
+
+class CompiledGrammar:
+    """One language's grammar compiled into regexes."""
+
+    def __init__(self, language: str, grammar: Dict):
+        self.language = language
+        # Whitespace lookarounds instead of \b: Devanagari vowel signs aren't \w
+        spaced = grammar.get('spaced', True)
+        start, end = (r'(?<!\S)', r'(?!\S)') if spaced else ('', '')
+        elisions = grammar.get('elisions')
+        self._elision = re.compile(rf"(?<!\S)({_alternation(elisions)})(?=\S)") if elisions else None
+
+        def phrases(words):
+            return re.compile(f"{start}(?:{_alternation(words)}){end}")
+
+        self._remove = phrases(grammar['remove'])
+        self._numbers = {word.lower(): value for word, value in grammar['numbers'].items()}
+        self._units = {form.lower(): unit for unit, forms in grammar['units'].items() for form in forms}
+        units = _alternation(self._units)
+        numbers = _alternation(self._numbers)
+        articles = grammar.get('articles', [])
+        strip = f"{start}(?:{_alternation(grammar['add'] + grammar['remove'] + grammar['fillers'])}){end}"
+        article = ''
+        if articles:
+            # Kept before a unit, where they are read as a quantity of one
+            strip += rf"|{start}(?:{_alternation(articles)}){end}(?!\s*(?:{units}){end})"
+            article = rf"|(?P<article>{_alternation(articles)})(?=\s*(?:{units}){end})"
+        self._strip = re.compile(strip)
+        number_word = f"(?P<word>{numbers})" + (end if spaced else f"(?={units})")
+        # A second number word multiplies the first: "two dozen", "una docena"
+        self._quantity = re.compile(
+            rf"{start}(?:(?P<digits>\d+(?:[.,]\d+)?)|{number_word}{article})"
+            rf"(?:\s*(?P<times>{numbers}){end})?(?:\s*(?P<unit>{units}){end})?"
+        )
+        # Leftmost keyword wins; at the same position the longest ("laitue" before "lait")
+        self._category_words = {w.lower(): category for category, words in grammar['categories'].items() for w in words}
+        self._category = re.compile(_alternation(self._category_words))
+
+    def normalize(self, text: str) -> str:
+        text = _PUNCTUATION.sub(' ', text.lower().replace('’', "'"))
+        if self._elision:
+            text = self._elision.sub(r'\1 ', text)
+        return ' '.join(text.split())
+
+    def command(self, text: str) -> str:
+        return 'remove' if self._remove.search(self.normalize(text)) else 'add'
+
+    def _find_quantity(self, text: str) -> Tuple[Optional[float], str, str]:
+        """(quantity or None, unit, text without the quantity) for already stripped text."""
+        match = self._quantity.search(text)
+        if not match:
+            return None, '', text
+        if match.group('digits'):
+            quantity = float(match.group('digits').replace(',', '.'))
+        elif match.groupdict().get('article'):
+            quantity = 1.0
+        else:
+            quantity = float(self._numbers[match.group('word')])
+        if match.group('times'):
+            quantity *= self._numbers[match.group('times')]
+        unit = self._units.get(match.group('unit') or '', '')
+        return quantity, unit, text[:match.start()] + ' ' + text[match.end():]
+
+    def quantity(self, text: str) -> Tuple[float, str]:
+        quantity, unit, _ = self._find_quantity(self._strip.sub(' ', self.normalize(text)))
+        return (quantity, unit) if quantity is not None else (1, '')
+
+    def category(self, item: str) -> str:
+        match = self._category.search(item.lower())
+        return self._category_words[match.group(0)] if match else 'other'
+
+    def parse(self, text: str) -> Dict:
+        # Commands and fillers go first: "kar do" must not be read as the number "do"
+        remainder = self._strip.sub(' ', self.normalize(text))
+        quantity, unit, remainder = self._find_quantity(remainder)
+        item_name = ' '.join(remainder.split()).strip()
+        return {
+            'command': self.command(text),
+            'item_name': item_name,
+            'quantity': quantity if quantity is not None else 1,
+            'unit': unit or None,
+            'category': self.category(item_name),
+        }
+
+
+_compiled: Dict[str, CompiledGrammar] = {}
+_compile_lock = threading.Lock()
+
+
+def language_of(language_code: Optional[str]) -> str:
+    """Grammar key for a transcription language code: 'es-ES' -> 'es', unknown -> English."""
+    if not language_code:
+        return DEFAULT_LANGUAGE
+    code = language_code.replace('_', '-').lower()
+    if code in GRAMMARS:
+        return code
+    base = code.split('-')[0]
+    return base if base in GRAMMARS else DEFAULT_LANGUAGE
+
+
+def get_grammar(language_code: Optional[str] = None) -> CompiledGrammar:
+    """Compiled grammar for a language, compiled on first use and cached."""
+    language = language_of(language_code)
+    grammar = _compiled.get(language)
+    if grammar is None:
+        with _compile_lock:
+            grammar = _compiled.get(language)
+            if grammar is None:
+                grammar = _compiled[language] = CompiledGrammar(language, GRAMMARS[language])
+    return grammar
+
+
+def register_grammar(language: str, grammar: Dict):
+    """Add or replace a language's grammar; it is compiled the next time it is used."""
+    with _compile_lock:
+        GRAMMARS[language.lower()] = grammar
+        _compiled.pop(language.lower(), None)
@@ -0,0 +1,148 @@
+import atexit
+import queue
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from app.config import Config
+from app.database import write_history_batch
+from app.tenancy import DEFAULT_HOUSEHOLD
+
+
+class HistoryWriter:
+    """Write-behind buffer for purchase history.
+
+    Request threads only enqueue purchases; a background thread drains the
+    bounded queue every ``flush_interval`` seconds, coalesces repeat purchases
+    of the same item into one increment and writes each household's batch in a
+    single transaction. When the queue is full, ``record`` blocks until the next flush
+    makes room. Pending purchases are flushed on ``close`` and at interpreter exit.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 10000, enabled: bool = True):
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._listeners: List[Callable[[List[Tuple[str, str, str, str]]], None]] = []
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._registered = False
+
+    def configure(self, flush_interval: float, max_pending: int, enabled: bool):
+        """Apply new settings; anything queued under the old ones is flushed first."""
+        self.flush()
+        with self._flush_lock:
+            self.flush_interval = flush_interval
+            self.enabled = enabled
+            if self._queue.maxsize != max_pending:
+                self._queue = queue.Queue(maxsize=max_pending)
+
+    def add_listener(self, listener: Callable[[List[Tuple[str, str, str, str]]], None]):
+        """Call ``listener(events)`` after every flush with the flushed
+        (household, item_name, category, purchased_at) events."""
+        self._listeners.append(listener)
+
+    def record(self, item_name: str, category: str, purchased_at: str = None, household: str = DEFAULT_HOUSEHOLD):
+        purchased_at = purchased_at or datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        event = (household, item_name, category, purchased_at)
+        if not self.enabled:
+            self._write([event])
+            return
+        self.start()
+        self._queue.put(event)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+            if not self._registered:
+                atexit.register(self.close)
+                self._registered = True
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of purchases written."""
+        with self._flush_lock:
+            events = []
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if events:
+                try:
+                    self._write(events)
+                except Exception:
+                    self._requeue(events)
+                    raise
+            return len(events)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _requeue(self, events: List[Tuple[str, str, str, str]]):
+        """Put a failed batch back so the next flush retries it."""
+        for i, event in enumerate(events):
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                print(f"Warning: history queue full, dropped {len(events) - i} purchases")
+                return
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: purchase history flush failed: {e}")
+
+    def _write(self, events: List[Tuple[str, str, str, str]]):
+        by_household: Dict[str, List[Tuple[str, str, str]]] = {}
+        for household, name, category, purchased_at in events:
+            by_household.setdefault(household, []).append((name, category, purchased_at))
+        written = []
+        try:
+            for household, household_events in by_household.items():
+                increments: Dict[Tuple[str, str], int] = Counter((name, category) for name, category, _ in household_events)
+                write_history_batch(increments, household_events, household=household)
+                written.append(household)
+        except Exception:
+            # Households already committed must not be written twice when the batch is retried
+            if written:
+                events[:] = [event for event in events if event[0] not in written]
+            raise
+        for listener in self._listeners:
+            try:
+                listener(events)
+            except Exception as e:
+                print(f"Warning: history flush listener failed: {e}")
+
+
+# Global instance, reconfigured by create_app for the active config
+history_writer = HistoryWriter(
+    flush_interval=Config.HISTORY_FLUSH_INTERVAL,
+    max_pending=Config.HISTORY_QUEUE_SIZE,
+    enabled=Config.HISTORY_WRITE_BEHIND,
+)
+
+
+def configure_history_writer(config):
+    """Apply ``config``'s HISTORY_* settings to the global writer."""
+    history_writer.configure(config.HISTORY_FLUSH_INTERVAL, config.HISTORY_QUEUE_SIZE, config.HISTORY_WRITE_BEHIND)
+    return history_writer
+
+
+def record_purchase(item_name: str, category: str, purchased_at: str = None, household: str = DEFAULT_HOUSEHOLD):
+    """Convenience function to queue a purchase for the history tables"""
+    history_writer.record(item_name, category, purchased_at, household)
@@ -0,0 +1,27 @@
+import threading
+from typing import Any, Callable, Optional
+
+
+class RunOnce:
+    """A deferred ``loader(target)`` that runs at most once, on the first ``run``.
+
+    Threads that call ``run`` while the loader is running wait for it to
+    finish; afterwards ``run`` is a no-op. A loader that raises is not retried.
+    """
+
+    def __init__(self):
+        self._loader: Optional[Callable[[Any], None]] = None
+        self._lock = threading.Lock()
+
+    def set(self, loader: Callable[[Any], None]):
+        self._loader = loader
+
+    def run(self, target):
+        if self._loader is None:
+            return
+        with self._lock:
+            if self._loader is not None:
+                try:
+                    self._loader(target)
+                finally:
+                    self._loader = None
@@ -0,0 +1,58 @@
+from typing import List, Dict, Any
+import json
+import numpy as np
+import pandas as pd
+
+
+def build_member_recommendations(df: pd.DataFrame, rules: List[Dict[str, Any]], top_n: int = 10,
+                                 personal_weight: float = 0.5) -> pd.DataFrame:
+    """Score every item for every member and keep each member's top N.
+
+    A member's score for an item blends how often they put it in a basket
+    (repurchase propensity) with the confidence-weighted pull of single-item
+    rules fired by their own basket history. Global popularity only breaks ties,
+    so members with thin histories still get sensible picks. Everything is one
+    member x item matrix, so it runs in a couple of matrix products.
+    """
+    df = df[['Member_number', 'Date', 'itemDescription']].dropna()
+    items = df['itemDescription'].str.strip().str.lower()
+    members, member_idx = np.unique(df['Member_number'].to_numpy(), return_inverse=True)
+    vocab, item_idx = np.unique(items.to_numpy(), return_inverse=True)
+    n_members, n_items = len(members), len(vocab)
+
+    # Baskets containing each item, per member (duplicates within a basket count once)
+    basket_keys = pd.DataFrame({'m': member_idx, 'd': df['Date'].to_numpy(), 'i': item_idx}).drop_duplicates()
+    counts = np.zeros((n_members, n_items), dtype=np.float64)
+    np.add.at(counts, (basket_keys['m'].to_numpy(), basket_keys['i'].to_numpy()), 1.0)
+    baskets_per_member = basket_keys.drop_duplicates(['m', 'd']).groupby('m').size().to_numpy(dtype=np.float64)
+    propensity = counts / baskets_per_member[:, None]
+
+    # item -> item association strength from single-item rules
+    lookup = {name: i for i, name in enumerate(vocab)}
+    assoc = np.zeros((n_items, n_items), dtype=np.float64)
+    for rule in rules:
+        if len(rule['base']) != 1 or len(rule['add']) != 1:
+            continue
+        b, a = lookup.get(rule['base'][0]), lookup.get(rule['add'][0])
+        if b is not None and a is not None:
+            assoc[b, a] = max(assoc[b, a], rule['confidence'])
+    rule_pull = propensity @ assoc
+    row_max = rule_pull.max(axis=1, keepdims=True)
+    rule_pull = np.divide(rule_pull, row_max, out=np.zeros_like(rule_pull), where=row_max > 0)
+
+    popularity = counts.sum(axis=0)
+    popularity = popularity / popularity.max() if n_items and popularity.max() > 0 else popularity
+    scores = personal_weight * propensity + (1 - personal_weight) * rule_pull + 1e-3 * popularity
+
+    top_n = min(top_n, n_items)
+    top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n] if top_n else np.empty((n_members, 0), dtype=int)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    payload = [
+        json.dumps([{'item': vocab[i], 'score': round(float(s), 4)} for i, s in zip(row_items, row_scores)])
+        for row_items, row_scores in zip(top, top_scores)
+    ]
+    return pd.DataFrame({'member_number': members.astype(int), 'items': payload})
@@ -0,0 +1,219 @@
+import csv
+import os
+import threading
+from itertools import chain
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.lazy import RunOnce
+
+
+def _deletes(term: str, max_distance: int) -> Set[str]:
+    """All strings reachable from ``term`` by deleting up to ``max_distance`` characters."""
+    result = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up with ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class _Vocabulary:
+    """Known names with their weights, indexed under their delete variants."""
+
+    def __init__(self, max_distance: int):
+        self.max_distance = max_distance
+        self.names: Dict[str, int] = {}
+        self.index: Dict[str, Set[str]] = {}
+        self.loader = RunOnce()
+
+    def add(self, name: str, weight: int, indexed: bool = True):
+        if indexed and name not in self.names:
+            for key in _deletes(name, self.max_distance):
+                self.index.setdefault(key, set()).add(name)
+        self.names[name] = self.names.get(name, 0) + weight
+
+
+def _clean(name) -> str:
+    return ' '.join(str(name).lower().split())
+
+
+class NameResolver:
+    """Map noisy item names ("hole milk", "bananna") to known canonical names.
+
+    SymSpell-style index: every known name is stored under each string you can
+    get by deleting up to ``max_distance`` characters from it. A query generates
+    its own deletes, so candidates come from a few dict lookups and only those
+    are scored with a real edit distance. Ties go to the more frequent name.
+
+    The shared vocabulary (catalog, dataset, rules) serves everyone. Names a
+    household has bought go into that household's own vocabulary, which is
+    only consulted for its lookups, so one household's item names never
+    resolve for another. A household's vocabulary is loaded on its first lookup.
+
+    Names shorter than ``min_length`` are never rewritten: one edit away from a
+    short word is usually another real word (beer/beef, peas/pear, ale/kale).
+    """
+
+    def __init__(self, max_distance: int = 2, min_confidence: float = 0.75, min_length: int = 5):
+        self.max_distance = max_distance
+        self.min_confidence = min_confidence
+        self.min_length = min_length
+        self._shared = _Vocabulary(max_distance)
+        self._households: Dict[str, _Vocabulary] = {}
+        self._household_loader = None
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> Dict[str, int]:
+        """The shared vocabulary"""
+        return self._shared.names
+
+    def set_loader(self, loader):
+        """Defer building: ``loader(resolver)`` runs once, on first use."""
+        self._shared.loader.set(loader)
+
+    def set_household_loader(self, loader):
+        """Defer each household's names: ``loader(resolver, household)`` runs once, on that household's first lookup."""
+        self._household_loader = loader
+
+    def ensure_loaded(self):
+        self._shared.loader.run(self)
+
+    def add_names(self, names: Iterable[str], weight: int = 1, household: Optional[str] = None):
+        """Add to the shared vocabulary, or only to ``household``'s."""
+        with self._lock:
+            vocabulary = self._shared if household is None else self._household(household)
+            for name in names:
+                name = _clean(name)
+                if not name:
+                    continue
+                # A household name the shared index already covers only needs its weight
+                vocabulary.add(name, weight, indexed=household is None or name not in self._shared.names)
+
+    def add_purchases(self, events: Iterable[Tuple[str, str, str, str]]):
+        """History-writer listener: flushed (household, item_name, category, purchased_at)
+        events join their household's vocabulary. Households not looked up yet are
+        skipped, since their loader reads the same purchases from history."""
+        by_household: Dict[str, list] = {}
+        for household, name, _, _ in events:
+            by_household.setdefault(household, []).append(name)
+        for household, names in by_household.items():
+            if household in self._households:
+                self.add_names(names, household=household)
+
+    def _household(self, household: str) -> _Vocabulary:
+        """The household's vocabulary, created on first use; call with ``_lock`` held."""
+        vocabulary = self._households.get(household)
+        if vocabulary is None:
+            vocabulary = self._households[household] = _Vocabulary(self.max_distance)
+            if self._household_loader is not None:
+                loader = self._household_loader
+                vocabulary.loader.set(lambda _: loader(self, household))
+        return vocabulary
+
+    def _vocabularies(self, household: Optional[str]):
+        self.ensure_loaded()
+        if household is None:
+            return [self._shared]
+        with self._lock:
+            vocabulary = self._household(household)
+        vocabulary.loader.run(vocabulary)
+        return [self._shared, vocabulary]
+
+    def resolve(self, text: str, household: Optional[str] = None) -> Dict:
+        """Return ``{'name', 'distance', 'confidence', 'resolved'}`` for a raw item name.
+
+        ``resolved`` is False (and ``name`` is the cleaned input) when no known
+        name is within ``max_distance`` edits at ``min_confidence``, or the input
+        is shorter than ``min_length`` and not known as is. With a ``household``,
+        its own purchased names count as known too.
+        """
+        vocabularies = self._vocabularies(household)
+        query = _clean(text)
+        if not query or any(query in v.names for v in vocabularies):
+            return {'name': query, 'distance': 0, 'confidence': 1.0, 'resolved': bool(query)}
+        if len(query) < self.min_length:
+            return {'name': query, 'distance': None, 'confidence': 0.0, 'resolved': False}
+
+        keys = _deletes(query, self.max_distance)
+        with self._lock:
+            candidates = {name: sum(v.names.get(name, 0) for v in vocabularies)
+                          for v in vocabularies
+                          for name in chain.from_iterable(v.index.get(key, ()) for key in keys)}
+        best: Optional[str] = None
+        best_key = None
+        for candidate, weight in candidates.items():
+            distance = _edit_distance(query, candidate, self.max_distance)
+            if distance > self.max_distance:
+                continue
+            key = (distance, -weight, candidate)
+            if best_key is None or key < best_key:
+                best, best_key = candidate, key
+
+        if best is not None:
+            confidence = 1 - best_key[0] / max(len(query), len(best))
+            if confidence >= self.min_confidence:
+                return {'name': best, 'distance': best_key[0], 'confidence': round(confidence, 3), 'resolved': True}
+        return {'name': query, 'distance': None, 'confidence': 0.0, 'resolved': False}
+
+    def canonical(self, text: str, household: Optional[str] = None) -> str:
+        """Resolved name if confident and different, otherwise the input unchanged."""
+        result = self.resolve(text, household)
+        return result['name'] if result['resolved'] and result['distance'] else text
+
+
+def load_known_names(resolver: NameResolver):
+    """Seed the shared vocabulary from the built-in catalog, the basket dataset and any trained rules.
+
+    The dataset's item column is read directly (training is lazy and may not
+    have run yet), so its names resolve from the first request. Purchase
+    history is per household, see ``load_household_names``.
+    """
+    from app.apriori import engine
+    from app.nlp_processor import NLPProcessor
+    from app.suggestions import SuggestionEngine
+    from app.training import DATASET_PATH
+
+    catalog = chain(chain.from_iterable(NLPProcessor.CATEGORIES.values()),
+                    chain.from_iterable(SuggestionEngine.SEASONAL_ITEMS.values()),
+                    SuggestionEngine.SUBSTITUTES.keys(), SuggestionEngine.SUBSTITUTES.values())
+    resolver.add_names(catalog)
+    if os.path.exists(DATASET_PATH):
+        with open(DATASET_PATH, newline='') as f:
+            resolver.add_names(row['itemDescription'] for row in csv.DictReader(f))
+    resolver.add_names(item for rule in engine.rules for item in rule['base'] + rule['add'])
+
+
+def load_household_names(resolver: NameResolver, household: str):
+    """Seed one household's vocabulary from its own purchase history."""
+    from app.database import get_history_item_names
+
+    for name, frequency in get_history_item_names(household):
+        resolver.add_names([name], weight=frequency or 1, household=household)
+
+
+# Global resolver
+name_resolver = NameResolver()
+
+
+def resolve_item_name(text: str, household: Optional[str] = None) -> Dict:
+    return name_resolver.resolve(text, household)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+
+def estimate_repurchase_intervals(df: pd.DataFrame, min_observations: int = 5) -> pd.Series:
+    """Median days between repeat purchases of each item, across all members.
+
+    Works on the raw ``Member_number, Date, itemDescription`` rows: gaps are
+    taken between consecutive distinct purchase days of the same member and
+    item, then pooled per item. Items with fewer than ``min_observations`` gaps
+    are dropped since their median is mostly noise.
+    """
+    events = pd.DataFrame({
+        'member': df['Member_number'],
+        'item': df['itemDescription'].str.strip().str.lower(),
+        'date': pd.to_datetime(df['Date'], format='%d-%m-%Y'),
+    }).drop_duplicates().sort_values(['member', 'item', 'date'])
+
+    gaps = events.groupby(['member', 'item'])['date'].diff().dt.days
+    gaps = pd.DataFrame({'item': events['item'], 'gap': gaps}).dropna()
+    stats = gaps.groupby('item')['gap'].agg(['median', 'size'])
+    return stats.loc[stats['size'] >= min_observations, 'median'].rename('interval_days')
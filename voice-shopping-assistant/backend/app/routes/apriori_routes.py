@@ -1,21 +1,91 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+import base64
+import json
 from app.apriori import engine
 
 # Yahan hum 'bp' define kar rahe hain jo __init__.py ko chahiye
 bp = Blueprint('apriori', __name__, url_prefix='/api/suggestions/apriori')
 
+MAX_PAGE_SIZE = 500
+
+
+def _rule_filters():
+    """Filters shared by the paged query and the export"""
+    args = request.args
+    return {
+        'antecedent': args.get('antecedent'),
+        'consequent': args.get('consequent'),
+        'min_support': args.get('min_support', 0.0, type=float),
+        'min_confidence': args.get('min_confidence', 0.0, type=float),
+        'min_lift': args.get('min_lift', 0.0, type=float),
+    }
+
+
+def _encode_cursor(rule_id):
+    return base64.urlsafe_b64encode(f"{engine.rules_version}:{rule_id}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """Return the last rule id of the previous page, or raise ValueError if the cursor is stale"""
+    version, rule_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+    if int(version) != engine.rules_version:
+        raise ValueError('Rules were retrained since this cursor was issued; start from the first page')
+    return int(rule_id)
+
+
+def _serialize(rule_id, rule):
+    return dict(rule, id=rule_id)
+
+
 @bp.route('/rules', methods=['GET'])
 def get_rules():
-    """Rules dekhne ke liye route"""
+    """Rules dekhne ke liye route (filters + cursor pagination)"""
+    engine.ensure_fitted()
+    try:
+        limit = max(1, min(request.args.get('limit', 20, type=int), MAX_PAGE_SIZE))
+        cursor = request.args.get('cursor')
+        after = _decode_cursor(cursor) if cursor else -1
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    page = []
+    next_cursor = None
+    for rule_id, rule in engine.query_rules(after=after, **_rule_filters()):
+        if len(page) == limit:
+            next_cursor = _encode_cursor(page[-1]['id'])
+            break
+        page.append(_serialize(rule_id, rule))
+
     return jsonify({
-        'rules_count': len(engine.rules),
-        'rules': [str(rule) for rule in engine.rules[:20]]
+        # Size of the whole rule set, not of the filtered result
+        'total_rules': len(engine.rules),
+        'rules': page,
+        'next_cursor': next_cursor
     })
 
+
+@bp.route('/rules/export', methods=['GET'])
+def export_rules():
+    """Stream every matching rule as NDJSON, one rule per line"""
+    engine.ensure_fitted()
+    filters = _rule_filters()
+
+    def generate():
+        for rule_id, rule in engine.query_rules(**filters):
+            yield json.dumps(_serialize(rule_id, rule)) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=rules.ndjson'}
+    )
+
+
 @bp.route('/predict', methods=['POST'])
 def predict():
     """Suggestions dene ke liye route"""
     data = request.get_json()
     current_items = data.get('items', [])
+    engine.ensure_fitted()
     predictions = engine.predict(current_items)
-    return jsonify({'predictions': predictions})
\ No newline at end of file
+    return jsonify({'predictions': predictions})
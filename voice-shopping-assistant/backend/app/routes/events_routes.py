@@ -0,0 +1,29 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from app.events import StreamLimitReached, change_feed
+from app.tenancy import current_household
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+@bp.route('/stream', methods=['GET'])
+def stream():
+    """Server-sent events: shopping list mutations and suggestion deltas"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    # Subscribe before the response starts, so a full server can still answer with a 503
+    try:
+        subscriber = change_feed.subscribe(last_event_id, household=current_household())
+    except StreamLimitReached:
+        return jsonify({'error': 'Too many open event streams, try again shortly'}), 503, {'Retry-After': '5'}
+
+    response = Response(
+        stream_with_context(change_feed.frames(subscriber)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # The generator's cleanup never runs if the client leaves before the first frame
+    response.call_on_close(lambda: change_feed.unsubscribe(subscriber))
+    return response
@@ -1,26 +1,31 @@
 from flask import Blueprint, request, jsonify
 from app.database import (
     add_shopping_item, get_shopping_list, remove_shopping_item,
-    mark_item_complete, add_to_history, get_db, remove_item_by_name
+    mark_item_complete, add_to_history, remove_item_by_name, get_shopping_item, update_item_quantity
 )
+from app.tenancy import current_household
+from app.history_writer import record_purchase
+from app.name_resolver import resolve_item_name
+from app.events import publish_list_change
 
 bp = Blueprint('shopping', __name__, url_prefix='/api/shopping')
 
+def _format_item(item):
+    """DB row -> the item shape the frontend expects"""
+    return {
+        'id': item['id'],
+        'item_name': item['item_name'],
+        'category': item.get('category'),
+        'quantity': item.get('quantity', 1),
+        'unit': item.get('unit')
+    }
+
 @bp.route('/list', methods=['GET'])
 def get_list():
     try:
-        items = get_shopping_list()
+        items = get_shopping_list(current_household())
         # Transform DB rows into frontend-expected shape and wrap in `items`
-        formatted = [
-            {
-                'id': i['id'],
-                'item_name': i['item_name'],
-                'category': i.get('category'),
-                'quantity': i.get('quantity', 1),
-                'unit': i.get('unit')
-            }
-            for i in items
-        ]
+        formatted = [_format_item(i) for i in items]
         return jsonify({'items': formatted}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -37,17 +42,29 @@ def add_item():
         category = data.get('category', 'other')
         quantity = data.get('quantity', 1)
 
-        item_id = add_shopping_item(name, category, quantity)
+        # Snap misheard names ("bananna") to a known item so the list doesn't fill with near-duplicates
+        household = current_household()
+        resolution = resolve_item_name(name, household)
+        if resolution['resolved'] and resolution['distance']:
+            name = resolution['name']
+
+        item_id = add_shopping_item(name, category, quantity, household=household)
+        stored = get_shopping_item(item_id, household=household)
+        if stored:
+            publish_list_change('item_upserted', _format_item(stored), household)
 
         # Return the created item in the shape frontend expects (`item`)
-        return jsonify({
+        response = {
             'item': {
                 'id': item_id,
                 'item_name': name,
                 'category': category,
                 'quantity': quantity
             }
-        }), 201
+        }
+        if resolution['resolved'] and resolution['distance']:
+            response['resolved_from'] = data.get('item_name') or data.get('name')
+        return jsonify(response), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -55,8 +72,10 @@ def add_item():
 @bp.route('/<int:item_id>', methods=['DELETE'])
 def delete_item(item_id):
     try:
-        success = remove_shopping_item(item_id)
+        household = current_household()
+        success = remove_shopping_item(item_id, household=household)
         if success:
+            publish_list_change('item_removed', {'id': item_id}, household)
             return jsonify({'success': True}), 200
         return jsonify({'error': 'Item not found'}), 404
     except Exception as e:
@@ -72,34 +91,21 @@ def update_item(item_id):
         if quantity is None:
             return jsonify({'error': 'Quantity is required'}), 400
         
+        household = current_household()
         if quantity < 1:
             # Delete item if quantity < 1
-            remove_shopping_item(item_id)
+            if remove_shopping_item(item_id, household=household):
+                publish_list_change('item_removed', {'id': item_id}, household)
             return jsonify({'success': True}), 200
         
-        # Update quantity in database
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute('UPDATE shopping_list SET quantity = ? WHERE id = ?', (quantity, item_id))
-            
-            # Fetch updated item
-            cursor.execute('SELECT * FROM shopping_list WHERE id = ?', (item_id,))
-            item = cursor.fetchone()
-            
-            if not item:
-                return jsonify({'error': 'Item not found'}), 404
-            
-            # Convert Row to dict for proper property access
-            item_dict = dict(item)
-            return jsonify({
-                'item': {
-                    'id': item_dict['id'],
-                    'item_name': item_dict['item_name'],
-                    'category': item_dict.get('category'),
-                    'quantity': item_dict.get('quantity', 1),
-                    'unit': item_dict.get('unit')
-                }
-            }), 200
+        # Update quantity in database (scoped to the household, so other households' ids 404)
+        item = update_item_quantity(item_id, quantity, household=household)
+        if not item:
+            return jsonify({'error': 'Item not found'}), 404
+        formatted = _format_item(item)
+
+        publish_list_change('item_upserted', formatted, household)
+        return jsonify({'item': formatted}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -107,8 +113,13 @@ def update_item(item_id):
 @bp.route('/<int:item_id>/complete', methods=['PUT'])
 def complete_item(item_id):
     try:
-        success = mark_item_complete(item_id)
+        household = current_household()
+        item = get_shopping_item(item_id, household=household)
+        success = mark_item_complete(item_id, household=household)
         if success:
+            # Checking an item off counts as a purchase
+            record_purchase(item['item_name'], item.get('category'), household=household)
+            publish_list_change('item_removed', {'id': item_id}, household)
             return jsonify({'success': True}), 200
         return jsonify({'error': 'Item not found'}), 404
     except Exception as e:
@@ -1,37 +1,57 @@
 from flask import Blueprint, jsonify
-from app.database import get_purchase_history, get_shopping_list
+from app.database import get_purchase_history, get_shopping_list, get_member_recommendations, get_due_items
 from app.suggestions import get_suggestions
 from app.apriori import engine as apriori_engine
+from app.similarity import similarity_index
+from app.name_resolver import name_resolver
+from app.tenancy import DEFAULT_HOUSEHOLD, current_household
 
 bp = Blueprint('suggestions', __name__, url_prefix='/api/suggestions')
 
-@bp.route('/', methods=['GET'])
-def get_smart_suggestions():
-    """Get smart suggestions based on history, seasonal, and Apriori rules"""
-    try:
-        history = get_purchase_history()
-        current_list = get_shopping_list()
-        suggestions = get_suggestions(history, current_list)
-        
-        # Add Apriori-based recommendations if engine has rules
-        if apriori_engine.rules:
-            # For each item in current list, get Apriori recommendations
-            for item in current_list:
-                apriori_recs = apriori_engine.get_recommendations(item['item_name'], top_n=2, min_confidence=0.15)
-                for rec in apriori_recs:
-                    # Check if not already suggested
+def collect_suggestions(household=DEFAULT_HOUSEHOLD):
+    """Suggestions for one household from its history, seasonal items, Apriori rules and item similarity, best first"""
+    apriori_engine.ensure_fitted()
+    history = get_purchase_history(household)
+    current_list = get_shopping_list(household)
+    suggestions = get_suggestions(history, current_list, get_due_items(household=household))
+    
+    # Add Apriori-based recommendations if engine has rules
+    if apriori_engine.rules:
+        # For each item in current list, get Apriori recommendations
+        for item in current_list:
+            lookup_name = name_resolver.canonical(item['item_name'])
+            apriori_recs = apriori_engine.get_recommendations(lookup_name, top_n=2, min_confidence=0.15)
+            for rec in apriori_recs:
+                # Check if not already suggested
+                if not any(s['item'].lower() == rec['item'].lower() for s in suggestions):
+                    suggestions.append({
+                        'item': rec['item'],
+                        'category': 'other',  # Could enhance with actual category
+                        'reason': f"Often bought with {item['item_name']} (confidence: {rec['confidence']:.0%})",
+                        'suggestion_type': 'apriori',
+                        'confidence': rec['confidence']
+                    })
+            if not apriori_recs:
+                # No exact rule for this item: fall back to its nearest neighbours
+                for rec in similarity_index.similar(lookup_name, top_n=2):
                     if not any(s['item'].lower() == rec['item'].lower() for s in suggestions):
                         suggestions.append({
                             'item': rec['item'],
-                            'category': 'other',  # Could enhance with actual category
-                            'reason': f"Often bought with {item['item_name']} (confidence: {rec['confidence']:.0%})",
-                            'suggestion_type': 'apriori',
-                            'confidence': rec['confidence']
+                            'category': 'other',
+                            'reason': f"Similar to {item['item_name']}",
+                            'suggestion_type': 'similar',
+                            'confidence': round(0.5 * rec['score'], 2)
                         })
-        
-        # Sort by confidence
-        suggestions.sort(key=lambda x: x.get('confidence', 0), reverse=True)
-        
+    
+    # Sort by confidence
+    suggestions.sort(key=lambda x: x.get('confidence', 0), reverse=True)
+    return suggestions
+
+@bp.route('/', methods=['GET'])
+def get_smart_suggestions():
+    """Get smart suggestions based on history, seasonal, and Apriori rules"""
+    try:
+        suggestions = collect_suggestions(current_household())
         return jsonify({
             'suggestions': suggestions,
             'count': len(suggestions)
@@ -43,10 +63,38 @@ def get_smart_suggestions():
 def get_history():
     """Get purchase history for user"""
     try:
-        history = get_purchase_history()
+        history = get_purchase_history(current_household())
         return jsonify({
             'history': history,
             'count': len(history)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@bp.route('/member/<int:member_number>', methods=['GET'])
+def get_member_suggestions(member_number):
+    """Get precomputed next-basket suggestions for a member"""
+    try:
+        items = get_member_recommendations(member_number)
+        if items is None:
+            return jsonify({'error': 'No recommendations for this member'}), 404
+        return jsonify({
+            'member_number': member_number,
+            'suggestions': items,
+            'count': len(items)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/similar/<path:item_name>', methods=['GET'])
+def get_similar_items(item_name):
+    """Get similar items and likely substitutes for an item"""
+    try:
+        apriori_engine.ensure_fitted()
+        return jsonify({
+            'item': item_name,
+            'similar': similarity_index.similar(name_resolver.canonical(item_name), top_n=10),
+            'substitutes': similarity_index.substitutes(name_resolver.canonical(item_name), top_n=5)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
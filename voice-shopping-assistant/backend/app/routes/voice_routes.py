@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from app.nlp_processor import process_command
+from app.nlp_processor import process_command, nlp_processor
 from app.voice_processor import transcribe_audio
+from app.name_resolver import resolve_item_name
+from app.tenancy import current_household
 
 bp = Blueprint('voice', __name__, url_prefix='/api/voice')
 
@@ -14,10 +16,19 @@ def process_voice_command():
         if not text:
             return jsonify({'error': 'Text is required'}), 400
         
-        result = process_command(text)
+        # The transcription language picks the grammar ("dos litros de leche", "do kilo aloo")
+        language = data.get('language_code') or data.get('language') or 'en-US'
+        result = process_command(text, language)
         
         if 'error' in result:
             return jsonify(result), 400
+
+        resolution = resolve_item_name(result['item_name'], current_household())
+        if resolution['resolved'] and resolution['distance']:
+            result['heard_item_name'] = result['item_name']
+            result['item_name'] = resolution['name']
+            result['category'] = nlp_processor.extract_category(resolution['name'], language)
+            result['resolution_confidence'] = resolution['confidence']
         
         return jsonify(result), 200
     except Exception as e:
@@ -35,6 +46,7 @@ def transcribe():
         
         audio_content = audio_file.read()
         result = transcribe_audio(audio_content, language)
+        result['language_code'] = language
         
         if result.get('error'):
             return jsonify(result), 400
@@ -0,0 +1,121 @@
+from typing import List, Dict, Any
+import re
+import time
+
+# Checkout lines that show up in baskets but are never worth suggesting
+NON_PRODUCT_ITEMS = frozenset({'shopping bags', 'bags'})
+
+# Head nouns shared by unrelated products ("baby food" vs "pet food")
+GENERIC_HEADS = frozenset({'products', 'product', 'care', 'bags', 'cosmetics', 'spreads', 'powder',
+                           'bar', 'food', 'beverages', 'meat', 'snack', 'articles', 'supplies'})
+
+
+def _head_noun(name: str) -> str:
+    words = [w for w in re.split(r'[^a-z]+', name) if w]
+    return words[-1] if words else ''
+
+
+class SimilarityIndex:
+    """Item-to-item similarity learned from basket co-occurrence.
+
+    ``fit`` builds a sparse item co-occurrence matrix, reweights it with
+    positive PMI, reduces it with truncated SVD and stores each item's top-K
+    neighbours in plain dicts. Queries are dict lookups.
+
+    ``similar`` ranks by embedding cosine, so items that share shopping
+    contexts come first. ``substitutes`` is much stricter, since a wrong
+    substitute is worse than none. Baskets alone cannot tell a substitute from
+    an everyday staple (whole milk and shopping bags look alike to them), so a
+    substitute must also be the same kind of product: its name ends in the same
+    head noun (whole milk / butter milk, canned beer / bottled beer), unless that
+    noun is too broad to mean anything (``GENERIC_HEADS``). It must score at
+    least ``min_substitute_score``, and the two may not be bought together more
+    than ``max_substitute_lift`` times as often as chance, which would make them
+    complements. Items with no such peer have no learned substitutes.
+
+    Non-product lines (``NON_PRODUCT_ITEMS``) are kept out of both lists.
+    """
+
+    def __init__(self):
+        self.neighbors: Dict[str, List[Dict[str, Any]]] = {}
+        self.substitute_map: Dict[str, List[Dict[str, Any]]] = {}
+        self.fit_stats: Dict[str, Any] = {}
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.neighbors)
+
+    def fit(self, transactions: List[List[str]], dimensions: int = 32, top_k: int = 10,
+            min_substitute_score: float = 0.15, max_substitute_lift: float = 1.5):
+        import numpy as np
+        from scipy import sparse
+        from scipy.sparse.linalg import svds
+
+        started = time.perf_counter()
+        baskets = [sorted({str(i).strip().lower() for i in t if str(i).strip()}) for t in transactions]
+        vocab = sorted({i for b in baskets for i in b})
+        n_items = len(vocab)
+        if n_items < 3:
+            self.neighbors, self.substitute_map = {}, {}
+            return self
+        index = {name: i for i, name in enumerate(vocab)}
+
+        # basket x item incidence, then item x item co-occurrence
+        rows = np.repeat(np.arange(len(baskets)), [len(b) for b in baskets])
+        cols = np.fromiter((index[i] for b in baskets for i in b), dtype=np.int64, count=len(rows))
+        incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(baskets), n_items))
+        cooc = (incidence.T @ incidence).tocoo()
+        item_counts = np.asarray(incidence.sum(axis=0)).ravel()
+
+        # positive PMI on the off-diagonal entries
+        off_diag = cooc.row != cooc.col
+        r, c, v = cooc.row[off_diag], cooc.col[off_diag], cooc.data[off_diag]
+        pmi = np.log(v * len(baskets) / (item_counts[r] * item_counts[c]))
+        keep = pmi > 0
+        ppmi = sparse.csr_matrix((pmi[keep], (r[keep], c[keep])), shape=(n_items, n_items))
+
+        k = max(1, min(dimensions, n_items - 2))
+        u, s, _ = svds(ppmi, k=k, v0=np.full(n_items, 1 / np.sqrt(n_items)))
+        embeddings = u * np.sqrt(s)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+        similarity = embeddings @ embeddings.T
+        np.fill_diagonal(similarity, -np.inf)
+
+        # substitutes: same kind of product, not bought together beyond chance
+        expected = np.outer(item_counts, item_counts) / len(baskets)
+        lift = cooc.toarray() / expected
+        heads = [_head_noun(name) for name in vocab]
+        top_k = min(top_k, n_items - 1)
+        order = np.argsort(-similarity, axis=1, kind='stable')
+        neighbors, substitutes = {}, {}
+        for i, name in enumerate(vocab):
+            ranked = [j for j in order[i] if np.isfinite(similarity[i, j]) and similarity[i, j] > 0
+                      and vocab[j] not in NON_PRODUCT_ITEMS]
+            neighbors[name] = [{'item': vocab[j], 'score': round(float(similarity[i, j]), 4)} for j in ranked[:top_k]]
+            if heads[i] in GENERIC_HEADS:
+                substitutes[name] = []
+                continue
+            substitutes[name] = [{'item': vocab[j], 'score': round(float(similarity[i, j]), 4)} for j in ranked
+                                 if heads[j] == heads[i] and similarity[i, j] >= min_substitute_score
+                                 and lift[i, j] <= max_substitute_lift][:top_k]
+
+        self.neighbors, self.substitute_map = neighbors, substitutes
+        self.fit_stats = {
+            'items': n_items,
+            'dimensions': k,
+            'substitutes': sum(1 for subs in substitutes.values() if subs),
+            'transactions': len(baskets),
+            'seconds': time.perf_counter() - started,
+        }
+        return self
+
+    def similar(self, item: str, top_n: int = 5) -> List[Dict[str, Any]]:
+        return self.neighbors.get(item.strip().lower(), [])[:top_n]
+
+    def substitutes(self, item: str, top_n: int = 3) -> List[Dict[str, Any]]:
+        return self.substitute_map.get(item.strip().lower(), [])[:top_n]
+
+
+# Global index
+similarity_index = SimilarityIndex()
@@ -1,6 +1,7 @@
 from typing import List, Dict
 from datetime import datetime
 import random
+from app.similarity import similarity_index
 
 class SuggestionEngine:
     """Generate smart suggestions based on history and seasonal items"""
@@ -20,11 +21,23 @@ class SuggestionEngine:
         'chips': 'popcorn'
     }
 
-    def get_suggestions(self, history: List[Dict], current_list: List[Dict]) -> List[Dict]:
+    def get_suggestions(self, history: List[Dict], current_list: List[Dict], due_items: List[Dict] = None) -> List[Dict]:
         current_names = [i['item_name'].lower() for i in current_list]
         suggestions = []
 
-        # 1. Substitute Suggestions (Check if a substitute exists for items in the list)
+        # 0. Due Suggestions (typical repurchase interval has elapsed since the last purchase)
+        for d_item in due_items or []:
+            name = d_item['item_name'].lower()
+            if name not in current_names:
+                suggestions.append({
+                    'item': d_item['item_name'],
+                    'category': d_item.get('category') or 'other',
+                    'reason': f"Usually bought every {d_item['interval_days']:.0f} days, "
+                              f"last bought {d_item['days_since']:.0f} days ago",
+                    'confidence': 0.85
+                })
+
+        # 1. Substitute Suggestions (hand-picked list first, learned from baskets otherwise)
         for item in current_list:
             name = item['item_name'].lower()
             if name in self.SUBSTITUTES:
@@ -36,6 +49,15 @@ class SuggestionEngine:
                         'reason': f"Try as a healthy alternative to {name}",
                         'confidence': 0.9
                     })
+                continue
+            learned = similarity_index.substitutes(name, top_n=1)
+            if learned and learned[0]['item'] not in current_names:
+                suggestions.append({
+                    'item': learned[0]['item'],
+                    'category': 'substitute',
+                    'reason': f"Shoppers pick this instead of {name}",
+                    'confidence': round(0.9 * learned[0]['score'], 2)
+                })
 
         # 2. History Suggestions (Items bought often but NOT in the current list)
         for h_item in history:
@@ -89,5 +111,5 @@ class SuggestionEngine:
 # Instance
 suggestion_engine = SuggestionEngine()
 
-def get_suggestions(purchase_history: List[Dict], current_list: List[Dict]) -> List[Dict]:
-    return suggestion_engine.get_suggestions(purchase_history, current_list)
\ No newline at end of file
+def get_suggestions(purchase_history: List[Dict], current_list: List[Dict], due_items: List[Dict] = None) -> List[Dict]:
+    return suggestion_engine.get_suggestions(purchase_history, current_list, due_items)
\ No newline at end of file
@@ -0,0 +1,21 @@
+import re
+
+DEFAULT_HOUSEHOLD = 'default'
+HOUSEHOLD_HEADER = 'X-Household-ID'
+
+_HOUSEHOLD_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def is_valid_household(household_id: str) -> bool:
+    """Household ids double as shard file names, so keep them to a safe alphabet."""
+    return bool(household_id and _HOUSEHOLD_PATTERN.match(household_id))
+
+
+def household_from_request(request) -> str:
+    """Household for a request: the X-Household-ID header, else ?household=, else the default"""
+    return request.headers.get(HOUSEHOLD_HEADER) or request.args.get('household') or DEFAULT_HOUSEHOLD
+
+
+def current_household() -> str:
+    from flask import g
+    return g.get('household', DEFAULT_HOUSEHOLD)
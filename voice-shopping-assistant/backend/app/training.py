@@ -0,0 +1,64 @@
+import os
+from typing import List
+from app.config import Config
+from app.database import get_purchase_history
+from app.similarity import similarity_index
+from app.name_resolver import name_resolver
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Groceries_dataset.csv')
+
+
+def load_baskets(csv_path: str = DATASET_PATH) -> List[List[str]]:
+    """Group the dataset rows into one basket per member and date."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    # Member aur Date ke hisab se grouping (Baskets)
+    return df.groupby(['Member_number', 'Date'])['itemDescription'].apply(list).tolist()
+
+
+def warm_up():
+    """Run the deferred training and name-index build now, so requests only wait if it's still running."""
+    from app.apriori import engine
+
+    engine.ensure_fitted()
+    name_resolver.ensure_loaded()
+
+
+def train_engine(engine, config=Config):
+    """Fit the Apriori engine from the dataset, or from purchase history if it is missing.
+
+    Mining settings (APRIORI_*) come from ``config``, the one create_app was given.
+    """
+    try:
+        if os.path.exists(DATASET_PATH):
+            print("Dataset mil gaya! AI train ho raha hai (Baskets banaye ja rahe hain)...")
+            baskets = load_baskets()
+
+            # AI ko dataset sikhayein
+            if config.APRIORI_SAMPLE_ERROR:
+                engine.fit_approximate(baskets, min_support=0.0005, min_confidence=0.05,
+                                       error=config.APRIORI_SAMPLE_ERROR, n_jobs=config.APRIORI_JOBS)
+            else:
+                engine.fit(baskets, min_support=0.0005, min_confidence=0.05,
+                           n_jobs=config.APRIORI_JOBS, n_partitions=config.APRIORI_PARTITIONS)
+            stats = engine.fit_stats
+            print(f"✅ Apriori model loaded with {len(engine.rules)} rules from Dataset "
+                  f"({stats['mode']}, {stats.get('n_partitions', 1)} partitions, {stats['seconds']:.2f}s)")
+
+            # Item similarity index for substitutes / "similar items"
+            similarity_index.fit(baskets)
+            print(f"✅ Similarity index built for {similarity_index.fit_stats.get('items', 0)} items "
+                  f"({similarity_index.fit_stats.get('substitutes', 0)} with learned substitutes)")
+
+            # Every dataset item becomes a canonical name for noisy transcripts
+            name_resolver.add_names(similarity_index.neighbors)
+        else:
+            print("Warning: Groceries_dataset.csv nahi mila! Purani history use ho rahi hai.")
+            history = get_purchase_history()
+            if history:
+                transactions = [[h['item_name'].lower()] for h in history]
+                engine.fit(transactions, min_support=0.001, min_confidence=0.1)
+                print(f"Apriori loaded with {len(engine.rules)} rules from Database")
+    except Exception as e:
+        print(f"Warning: Apriori initialize nahi ho paya: {e}")
@@ -1,34 +1,60 @@
 import base64
 import json
+import threading
 from typing import Dict
 
-try:
-    from google.cloud import speech_v1
-    from google.oauth2 import service_account
-    GOOGLE_CLOUD_AVAILABLE = True
-except ImportError:
-    GOOGLE_CLOUD_AVAILABLE = False
-    print("Warning: Google Cloud Speech-to-Text not available. Using mock transcription.")
+GOOGLE_CLOUD_AVAILABLE = None
+speech_v1 = None
+service_account = None
+
+def _import_google_speech() -> bool:
+    """Import the Google Cloud Speech client on first use; it is slow and memory-heavy."""
+    global GOOGLE_CLOUD_AVAILABLE, speech_v1, service_account
+    if GOOGLE_CLOUD_AVAILABLE is None:
+        try:
+            from google.cloud import speech_v1 as _speech_v1
+            from google.oauth2 import service_account as _service_account
+            speech_v1, service_account = _speech_v1, _service_account
+            GOOGLE_CLOUD_AVAILABLE = True
+        except ImportError:
+            GOOGLE_CLOUD_AVAILABLE = False
+            print("Warning: Google Cloud Speech-to-Text not available. Using mock transcription.")
+    return GOOGLE_CLOUD_AVAILABLE
 
 class VoiceProcessor:
     """Handle voice recognition using Google Cloud Speech-to-Text"""
     
     def __init__(self, credentials_path=None):
-        """Initialize with Google Cloud credentials"""
+        """Remember credentials; the Speech client is created on first use"""
         self.credentials_path = credentials_path
-        self.client = None
+        self._client = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._client = self._create_client()
+                    self._initialized = True
+        return self._client
+
+    def _create_client(self):
+        """Initialize with Google Cloud credentials"""
         try:
-            if GOOGLE_CLOUD_AVAILABLE and credentials_path:
+            if _import_google_speech() and self.credentials_path:
                 self.credentials = service_account.Credentials.from_service_account_file(
-                    credentials_path
+                    self.credentials_path
                 )
-                self.client = speech_v1.SpeechClient(credentials=self.credentials)
+                return speech_v1.SpeechClient(credentials=self.credentials)
             elif GOOGLE_CLOUD_AVAILABLE:
                 # Use default credentials
-                self.client = speech_v1.SpeechClient()
+                return speech_v1.SpeechClient()
         except Exception as e:
             print(f"Warning: Could not initialize Google Cloud Speech client: {e}")
             print("Fallback: Using mock voice processing")
+        return None
     
     def transcribe_audio(self, audio_content: bytes, language_code: str = 'en-US') -> Dict:
         """Transcribe audio to text"""
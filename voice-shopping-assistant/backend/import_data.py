@@ -1,9 +1,6 @@
 import pandas as pd
-import sqlite3
 import os
-
-# Path to your database - make sure this matches your config
-DB_PATH = 'shopping_assistant.db'
+import time
 
 def import_and_train():
     if not os.path.exists('Groceries_dataset.csv'):
@@ -13,27 +10,27 @@ def import_and_train():
     print("--- Starting Data Import ---")
     df = pd.read_csv('Groceries_dataset.csv')
     
-    # 1. Connect to SQLite
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # 2. Clear existing history to avoid duplicates
-    cursor.execute("DELETE FROM purchase_history")
-
-    # 3. Import Global Frequencies
-    # This makes 'whole milk' show up as a suggestion because it's popular
-    print("Calculating item frequencies...")
-    item_counts = df['itemDescription'].value_counts().reset_index()
-    item_counts.columns = ['item_name', 'frequency']
-
-    for _, row in item_counts.iterrows():
-        cursor.execute('''
-            INSERT INTO purchase_history (item_name, category, frequency)
-            VALUES (?, ?, ?)
-        ''', (row['item_name'], 'grocery', int(row['frequency'])))
-
-    conn.commit()
-    conn.close()
+    # 1. Connect to the configured database (get_db creates or migrates the schema)
+    from app.database import get_db
+    from app.tenancy import DEFAULT_HOUSEHOLD
+    with get_db() as conn:
+        cursor = conn.cursor()
+
+        # 2. Clear existing history to avoid duplicates (dataset popularity belongs to the default household)
+        cursor.execute("DELETE FROM purchase_history WHERE household_id = ?", (DEFAULT_HOUSEHOLD,))
+
+        # 3. Import Global Frequencies
+        # This makes 'whole milk' show up as a suggestion because it's popular
+        print("Calculating item frequencies...")
+        item_counts = df['itemDescription'].value_counts().reset_index()
+        item_counts.columns = ['item_name', 'frequency']
+
+        for _, row in item_counts.iterrows():
+            cursor.execute('''
+                INSERT INTO purchase_history (household_id, item_name, category, frequency)
+                VALUES (?, ?, ?, ?)
+            ''', (DEFAULT_HOUSEHOLD, row['item_name'], 'grocery', int(row['frequency'])))
+
     print(f"✅ Success! Imported {len(item_counts)} items into history.")
     print("--- Now training the Apriori AI ---")
 
@@ -46,5 +43,21 @@ def import_and_train():
     engine.fit(baskets, min_support=0.0005, min_confidence=0.05)
     print(f"✅ AI Trained! Found {len(engine.rules)} smart associations.")
 
+    # 5. Precompute each member's next-basket picks (rules + their own history)
+    print("--- Building per-member recommendations ---")
+    from app.database import save_member_recommendations
+    from app.member_recommendations import build_member_recommendations
+    start = time.perf_counter()
+    table = build_member_recommendations(df, engine.rules, top_n=10)
+    save_member_recommendations(list(table.itertuples(index=False, name=None)))
+    print(f"✅ Stored recommendations for {len(table)} members in {time.perf_counter() - start:.2f}s")
+
+    # 6. Typical repurchase intervals become the priors for "due" suggestions
+    from app.database import save_repurchase_priors
+    from app.repurchase import estimate_repurchase_intervals
+    intervals = estimate_repurchase_intervals(df)
+    save_repurchase_priors(list(intervals.items()))
+    print(f"✅ Stored repurchase intervals for {len(intervals)} items")
+
 if __name__ == "__main__":
     import_and_train()
\ No newline at end of file
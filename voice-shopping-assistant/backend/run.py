@@ -5,9 +5,7 @@ from app.config import config
 def create_application():
     """Create and configure the Flask application"""
     env = os.getenv('FLASK_ENV', 'development')
-    app = create_app()
-    app.config.from_object(config[env])
-    return app
+    return create_app(config[env])
 
 if __name__ == '__main__':
     app = create_application()
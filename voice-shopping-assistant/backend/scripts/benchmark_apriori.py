@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+# Ensure project root is on sys.path so `app` package is importable when script is run directly
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from app.apriori import AprioriEngine
+from scripts.run_apriori_sample import load_csv_transactions
+
+
+DATA_PATH = os.path.join(root, 'Groceries_dataset.csv')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare serial and partitioned Apriori mining.')
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--partitions', type=int, default=None)
+    parser.add_argument('--min-support', type=float, default=0.0005)
+    parser.add_argument('--min-confidence', type=float, default=0.05)
+    args = parser.parse_args()
+
+    tx = load_csv_transactions(args.data)
+    if not tx:
+        print('No transactions loaded.')
+        raise SystemExit(1)
+
+    engine = AprioriEngine()
+    serial = engine.fit(tx, min_support=args.min_support, min_confidence=args.min_confidence)
+    serial_stats = engine.fit_stats
+    parallel = engine.fit(tx, min_support=args.min_support, min_confidence=args.min_confidence,
+                          n_jobs=args.jobs, n_partitions=args.partitions)
+    parallel_stats = engine.fit_stats
+
+    print(f"Transactions: {len(tx)}")
+    print(f"Serial:      {serial_stats['seconds']:.3f}s, {len(serial)} rules")
+    print(f"Partitioned: {parallel_stats['seconds']:.3f}s, {len(parallel)} rules "
+          f"({parallel_stats['n_jobs']} jobs, {parallel_stats['n_partitions']} partitions)")
+    if parallel_stats['fallback']:
+        print(f"Fallback:    {parallel_stats['fallback']}")
+    print(f"Speedup:     {serial_stats['seconds'] / parallel_stats['seconds']:.2f}x")
+    if serial != parallel:
+        print('ERROR: partitioned rules differ from serial rules')
+        raise SystemExit(1)
+    print('Rules identical: yes')
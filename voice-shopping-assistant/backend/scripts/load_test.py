@@ -0,0 +1,256 @@
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+# Ensure project root is on sys.path so `app` package is importable when script is run directly
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from app.config import TestingConfig
+from app.voice_processor import VoiceProcessor
+
+
+DEFAULT_MIX = 'voice=4,add=3,complete=2,suggestions=1'
+
+ITEMS = ['milk', 'whole milk', 'bread', 'eggs', 'bananas', 'apples', 'rice', 'yogurt', 'butter',
+         'chicken', 'tomatoes', 'onions', 'coffee', 'cheese', 'pasta', 'orange juice']
+# A few misheard names so the resolver does real work
+MISHEARD = ['bananna', 'hole milk', 'yoghurt', 'tomatos', 'chiken']
+PHRASES = ['add {qty} {item}', 'i need {item}', 'buy {qty} {item} please', 'get {item}',
+           'put {item} on my list', 'remove {item}']
+
+
+class StubVoiceProcessor(VoiceProcessor):
+    """Deterministic recognizer: the same audio bytes always produce the same transcript."""
+
+    def __init__(self, transcripts):
+        super().__init__()
+        self.transcripts = list(transcripts)
+        self._initialized = True
+
+    def transcribe_audio(self, audio_content: bytes, language_code: str = 'en-US'):
+        text = self.transcripts[zlib.crc32(audio_content) % len(self.transcripts)]
+        return {'text': text, 'confidence': 0.95, 'error': None}
+
+    def is_available(self) -> bool:
+        return True
+
+
+def build_transcripts(seed=0, count=200):
+    rng = random.Random(seed)
+    names = ITEMS + MISHEARD
+    return [rng.choice(PHRASES).format(qty=rng.randint(1, 5), item=rng.choice(names)) for _ in range(count)]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name.strip()!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Client:
+    """One simulated household talking to the server over localhost HTTP."""
+
+    def __init__(self, base_url, household, voice, rng):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port
+        self.household = household
+        self.voice = voice
+        self.rng = rng
+        self.open_items = []
+
+    def request(self, method, path, body=None, content_type='application/json'):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            headers = {'X-Household-ID': self.household}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body) if content_type == 'application/json' else body
+                headers['Content-Type'] = content_type
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, json.loads(data) if data else None
+        finally:
+            conn.close()
+
+    def _audio(self):
+        return self.rng.getrandbits(64).to_bytes(8, 'little')
+
+    def voice_op(self):
+        text = self.voice.transcribe_audio(self._audio())['text']
+        return 'POST /api/voice/process', self.request('POST', '/api/voice/process', {'text': text})
+
+    def transcribe_op(self):
+        boundary = 'load-test-boundary'
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="language"\r\n\r\nen-US\r\n'
+                f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="clip.wav"\r\n'
+                f'Content-Type: audio/wav\r\n\r\n').encode() + self._audio() + f'\r\n--{boundary}--\r\n'.encode()
+        return 'POST /api/voice/transcribe', self.request('POST', '/api/voice/transcribe', body,
+                                                          f'multipart/form-data; boundary={boundary}')
+
+    def add_op(self):
+        body = {'item_name': self.rng.choice(ITEMS + MISHEARD), 'quantity': self.rng.randint(1, 3)}
+        status, data = self.request('POST', '/api/shopping/add', body)
+        if status == 201:
+            self.open_items.append(data['item']['id'])
+        return 'POST /api/shopping/add', (status, data)
+
+    def complete_op(self):
+        if not self.open_items:
+            return self.add_op()
+        item_id = self.open_items.pop(self.rng.randrange(len(self.open_items)))
+        return 'PUT /api/shopping/<id>/complete', self.request('PUT', f'/api/shopping/{item_id}/complete')
+
+    def suggestions_op(self):
+        return 'GET /api/suggestions/', self.request('GET', '/api/suggestions/')
+
+
+OPERATIONS = {
+    'voice': Client.voice_op,
+    'transcribe': Client.transcribe_op,
+    'add': Client.add_op,
+    'complete': Client.complete_op,
+    'suggestions': Client.suggestions_op,
+}
+
+
+def start_server(config=TestingConfig):
+    """Serve create_app(config) on a free localhost port with the stub recognizer installed.
+
+    The default TestingConfig keeps the database in memory, so runs measure
+    the app rather than the disk and never touch shopping_assistant.db.
+    """
+    import logging
+    from werkzeug.serving import make_server
+    import app.voice_processor
+    from app import create_app
+
+    app.voice_processor.voice_processor = StubVoiceProcessor(build_transcripts())
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, create_app(config), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='load-test-server', daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def run_load(base_url, requests=1000, concurrency=8, mix=DEFAULT_MIX, seed=0, warmup=True):
+    """Replay ``requests`` operations drawn from ``mix`` across ``concurrency`` households.
+
+    Returns ``{'seconds', 'throughput', 'endpoints': {endpoint: stats}}`` where
+    stats holds the request count, error count, throughput and p50/p95/p99 in ms.
+    """
+    weights = parse_mix(mix) if isinstance(mix, str) else dict(mix)
+    names = list(weights)
+    plan = random.Random(seed).choices(names, weights=[weights[n] for n in names], k=requests)
+    transcripts = build_transcripts(seed)
+    clients = [Client(base_url, f'load-{seed}-{i}', StubVoiceProcessor(transcripts), random.Random(seed * 1000 + i))
+               for i in range(concurrency)]
+
+    if warmup:
+        # First suggestions request trains the rules; keep that out of the measurements
+        for name in names:
+            OPERATIONS[name](clients[0])
+
+    samples = {}
+    lock = threading.Lock()
+
+    def worker(index):
+        client = clients[index]
+        local = []
+        for name in plan[index::concurrency]:
+            started = time.perf_counter()
+            try:
+                endpoint, (status, _) = OPERATIONS[name](client)
+            except Exception:
+                endpoint, status = name, None
+            local.append((endpoint, time.perf_counter() - started, status))
+        with lock:
+            for endpoint, seconds, status in local:
+                samples.setdefault(endpoint, []).append((seconds, status))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, rows in sorted(samples.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in rows)
+        endpoints[endpoint] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, status in rows if status is None or status >= 500),
+            'throughput': len(rows) / elapsed,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+        }
+    return {'seconds': elapsed, 'throughput': requests / elapsed, 'concurrency': concurrency, 'endpoints': endpoints}
+
+
+def print_report(report):
+    print(f"{report['concurrency']} concurrent households, {report['seconds']:.2f}s, "
+          f"{report['throughput']:.1f} req/s overall")
+    print(f"  {'endpoint':34} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, s in report['endpoints'].items():
+        print(f"  {endpoint:34} {s['requests']:6d} {s['errors']:6d} {s['throughput']:8.1f} "
+              f"{s['p50_ms']:8.1f} {s['p95_ms']:8.1f} {s['p99_ms']:8.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a mix of API traffic against the app on localhost '
+                                                 'and report throughput and latency percentiles per endpoint.')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8],
+                        help='one or more concurrency levels to run in turn')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'operation weights, from {", ".join(OPERATIONS)} (default {DEFAULT_MIX})')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='target an already running server on localhost instead of an in-process one')
+    parser.add_argument('--database', help='SQLite file for the in-process server (default: shared in-memory database)')
+    parser.add_argument('--json', action='store_true', help='print the reports as JSON')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        if urlsplit(args.url).hostname not in ('127.0.0.1', 'localhost', '::1'):
+            parser.error('--url must point at localhost')
+        base_url = args.url
+    else:
+        config = type('LoadTestConfig', (TestingConfig,), {'DATABASE': args.database}) if args.database else TestingConfig
+        server, base_url = start_server(config)
+
+    try:
+        reports = [run_load(base_url, args.requests, c, args.mix, args.seed) for c in args.concurrency]
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must only load on the code paths that need them
+LAZY_MODULES = ('pandas', 'numpy', 'apyori', 'google.cloud')
+
+BOOT = '''
+import json, resource, sys, threading, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+report = {
+    'seconds': time.perf_counter() - start,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': sorted(sys.modules),
+    'warm_start': False,
+}
+# With WARM_START the process keeps growing after boot; wait for it and measure that too
+for thread in [t for t in threading.enumerate() if t.name == 'warm-up']:
+    thread.join()
+    report.update(warm_start=True, warm_up_seconds=time.perf_counter() - start,
+                  warm_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print(json.dumps(report))
+'''
+
+
+def measure_startup(env=None):
+    """Boot the app in a fresh interpreter under ``-X importtime``, with ``env`` added to the environment.
+
+    Measures the app as configured: with WARM_START on, the report also has the
+    time and max RSS once the warm-up thread has finished.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT],
+                          cwd=root, capture_output=True, text=True, check=True, env={**os.environ, **(env or {})})
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us), 'depth': depth})
+    report['imports'] = imports
+    report['import_seconds'] = sum(i['cumulative_us'] for i in imports if i['depth'] == 0) / 1e6
+    # Warm start loads these on purpose (and may be doing so as create_app returns)
+    report['lazy_loaded'] = [] if report['warm_start'] else [m for m in LAZY_MODULES if m in report['modules']]
+    report['settled_rss_kb'] = report.get('warm_rss_kb', report['max_rss_kb'])
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report create_app() startup time and fail when it exceeds the budget.')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', '1000')))
+    parser.add_argument('--rss-budget-mb', type=float, default=float(os.getenv('STARTUP_RSS_BUDGET_MB', '64')),
+                        help='max RSS once booted (and warmed up, with WARM_START=1)')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    report = measure_startup()
+    print(f"create_app(): {report['seconds'] * 1000:.0f} ms (budget {args.budget_ms:.0f} ms), "
+          f"imports {report['import_seconds'] * 1000:.0f} ms, max RSS {report['max_rss_kb'] / 1024:.1f} MB")
+    if report['warm_start']:
+        print(f"warm-up done after {report['warm_up_seconds'] * 1000:.0f} ms, "
+              f"max RSS {report['warm_rss_kb'] / 1024:.1f} MB")
+    print(f"Top {args.top} imports by cumulative time:")
+    for item in sorted(report['imports'], key=lambda i: i['cumulative_us'], reverse=True)[:args.top]:
+        print(f"  {item['cumulative_us'] / 1000:8.1f} ms  {item['module']}")
+
+    failed = False
+    if report['lazy_loaded']:
+        print(f"ERROR: heavy modules imported at startup: {', '.join(report['lazy_loaded'])}")
+        failed = True
+    if report['seconds'] * 1000 > args.budget_ms:
+        print('ERROR: startup exceeded its budget')
+        failed = True
+    if report['settled_rss_kb'] / 1024 > args.rss_budget_mb:
+        print(f"ERROR: max RSS {report['settled_rss_kb'] / 1024:.1f} MB exceeded its {args.rss_budget_mb:.0f} MB budget")
+        failed = True
+    raise SystemExit(1 if failed else 0)
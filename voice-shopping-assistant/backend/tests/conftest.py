@@ -0,0 +1,5 @@
+from app.config import TestingConfig
+from app.database import configure_storage
+
+# Run the suite against a shared in-memory database instead of shopping_assistant.db
+configure_storage(TestingConfig)
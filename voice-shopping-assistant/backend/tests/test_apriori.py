@@ -0,0 +1,113 @@
+import sys
+sys.path.insert(0, '/app')
+
+from app.apriori import AprioriEngine
+
+TRANSACTIONS = [
+    ['milk', 'bread', 'butter'],
+    ['milk', 'bread'],
+    ['bread', 'butter', 'jam'],
+    ['milk', 'eggs'],
+    ['milk', 'bread', 'eggs', 'butter'],
+    ['eggs', 'jam'],
+    ['milk', 'bread', 'jam'],
+    ['bread', 'butter'],
+] * 5
+
+def test_partitioned_fit_matches_serial():
+    engine = AprioriEngine()
+    transactions = TRANSACTIONS * 25
+    serial = engine.fit(transactions, min_support=0.1, min_confidence=0.2)
+    assert engine.fit_stats['mode'] == 'serial'
+
+    parallel = engine.fit(transactions, min_support=0.1, min_confidence=0.2, n_jobs=2, n_partitions=3)
+    assert engine.fit_stats['mode'] == 'partitioned'
+    assert engine.fit_stats['n_partitions'] == 3
+    assert parallel == serial
+
+def test_partitioned_fit_falls_back_when_partitions_are_too_small():
+    engine = AprioriEngine()
+    serial = engine.fit(TRANSACTIONS, min_support=0.1, min_confidence=0.2)
+    # 40 transactions at 10% support is 4 occurrences: too few to split
+    assert engine.fit(TRANSACTIONS, min_support=0.1, min_confidence=0.2, n_jobs=4) == serial
+    assert engine.fit_stats['mode'] == 'serial'
+    assert engine.fit_stats['requested_partitions'] == 4
+    assert 'per partition' in engine.fit_stats['fallback']
+
+def test_sampled_fit_verified_is_exact():
+    engine = AprioriEngine()
+    transactions = TRANSACTIONS * 50
+    exact = engine.fit(transactions, min_support=0.3, min_confidence=0.2)
+
+    rules = engine.fit_approximate(transactions, min_support=0.3, min_confidence=0.2, error=0.1)
+    assert engine.fit_stats['sample_size'] < len(transactions)
+    assert engine.fit_stats['exact']
+    assert [{k: r[k] for k in ('base', 'add', 'support', 'confidence', 'lift')} for r in rules] == exact
+
+def test_sampled_fit_unverified_reports_bounds():
+    engine = AprioriEngine()
+    rules = engine.fit_approximate(TRANSACTIONS * 50, min_support=0.3, min_confidence=0.2, error=0.1, verify=False)
+    assert not engine.fit_stats['exact']
+    assert rules
+    assert all(r['support_error'] == 0.1 and 0 <= r['confidence_error'] <= 1 for r in rules)
+
+def test_sampled_fit_streams_and_keeps_only_the_sample():
+    engine = AprioriEngine()
+    transactions = TRANSACTIONS * 50
+    exact = engine.fit(transactions, min_support=0.3, min_confidence=0.2)
+
+    engine.fit_approximate(iter(transactions), min_support=0.3, min_confidence=0.2, error=0.1, verify=False)
+    assert engine.fit_stats['transactions'] == len(transactions)
+    assert len(engine.transactions) == engine.fit_stats['sample_size'] < len(transactions)
+
+    # A one-shot iterator is still enough to verify: the log is kept for the counting pass
+    rules = engine.fit_approximate(iter(transactions), min_support=0.3, min_confidence=0.2, error=0.1)
+    assert engine.fit_stats['exact']
+    assert [{k: r[k] for k in ('base', 'add', 'support', 'confidence', 'lift')} for r in rules] == exact
+
+def test_query_rules_filters_and_pages():
+    engine = AprioriEngine()
+    rules = engine.fit(TRANSACTIONS, min_support=0.1, min_confidence=0.2)
+
+    expected = [i for i, r in enumerate(rules) if 'bread' in r['base'] and r['confidence'] >= 0.5]
+    assert [i for i, _ in engine.query_rules(antecedent='Bread', min_confidence=0.5)] == expected
+
+    first_page = [i for i, _ in engine.query_rules(consequent='milk')][:2]
+    rest = [i for i, _ in engine.query_rules(consequent='milk', after=first_page[-1])]
+    assert first_page + rest == [i for i, r in enumerate(rules) if 'milk' in r['add']]
+
+def test_rules_route_reports_total_rules_separately_from_the_page():
+    from app import create_app
+    from app.apriori import engine
+    from app.config import TestingConfig
+
+    client = create_app(TestingConfig).test_client()
+    engine.set_loader(None)
+    rules = engine.fit(TRANSACTIONS, min_support=0.1, min_confidence=0.2)
+
+    body = client.get('/api/suggestions/apriori/rules?antecedent=bread&min_confidence=0.5&limit=500').get_json()
+    assert body['total_rules'] == len(rules)
+    assert 'rules_count' not in body
+    assert [r['id'] for r in body['rules']] == [i for i, r in enumerate(rules)
+                                               if 'bread' in r['base'] and r['confidence'] >= 0.5]
+
+def test_training_uses_the_active_config():
+    from app import create_app
+    from app.apriori import engine
+    from app.config import TestingConfig
+
+    create_app(type('SampledConfig', (TestingConfig,), {'APRIORI_SAMPLE_ERROR': 0.0002}))
+    engine.ensure_fitted()
+    assert engine.fit_stats['mode'] == 'sampled'
+    assert engine.fit_stats['support_error'] in (0.0, 0.0002)
+
+if __name__ == "__main__":
+    test_partitioned_fit_matches_serial()
+    test_partitioned_fit_falls_back_when_partitions_are_too_small()
+    test_sampled_fit_verified_is_exact()
+    test_sampled_fit_unverified_reports_bounds()
+    test_sampled_fit_streams_and_keeps_only_the_sample()
+    test_query_rules_filters_and_pages()
+    test_rules_route_reports_total_rules_separately_from_the_page()
+    test_training_uses_the_active_config()
+    print("All apriori tests passed!")
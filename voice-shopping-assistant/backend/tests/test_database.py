@@ -1,7 +1,10 @@
 import sys
 sys.path.insert(0, '/app')
 
-from app.database import add_shopping_item, get_shopping_list, remove_shopping_item
+from app.database import (add_shopping_item, get_shopping_list, remove_shopping_item, get_db, init_db, Storage,
+                          add_to_history, write_history_batch, get_due_items, save_repurchase_priors)
+from app.history_writer import HistoryWriter, history_writer
+from app.config import TestingConfig
 
 def test_add_item():
     item_id = add_shopping_item("Test Milk", "dairy", 1, "bottle")
@@ -26,8 +29,161 @@ def test_get_empty_list():
     items = get_shopping_list()
     assert len(items) == 0
 
+def test_history_writer_coalesces_and_notifies():
+    init_db()
+    with get_db() as conn:
+        conn.execute("DELETE FROM purchase_history WHERE item_name = 'Test Juice'")
+    flushed = []
+    writer = HistoryWriter(flush_interval=60)
+    writer.add_listener(flushed.extend)
+    for _ in range(3):
+        writer.record("Test Juice", "beverages")
+    writer.close()
+
+    assert len(flushed) == 3
+    with get_db() as conn:
+        rows = conn.execute("SELECT frequency FROM purchase_history WHERE item_name = 'Test Juice'").fetchall()
+    assert [r['frequency'] for r in rows] == [3]
+
+def test_create_app_configures_history_writer():
+    from app import create_app
+    saved = (history_writer.flush_interval, history_writer._queue.maxsize, history_writer.enabled)
+    config = type('SyncHistoryConfig', (TestingConfig,), {'HISTORY_WRITE_BEHIND': False, 'HISTORY_QUEUE_SIZE': 5})
+    try:
+        create_app(config)
+        assert not history_writer.enabled
+        assert history_writer._queue.maxsize == 5
+    finally:
+        history_writer.configure(*saved)
+
+def test_switching_config_flushes_history_into_the_old_database():
+    import os
+    import tempfile
+    from app import create_app
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'old.db')
+        create_app(type('FileConfig', (TestingConfig,), {'DATABASE': path}))
+        history_writer.record("Test Chutney", "condiments", household='test-switch')
+        create_app(TestingConfig)
+
+        # The purchase queued under the old config lands in the old database, not the new one
+        with Storage(path).connect('test-switch') as conn:
+            assert conn.execute("SELECT COUNT(*) FROM purchase_events WHERE item_name = 'Test Chutney'").fetchone()[0] == 1
+        with get_db('test-switch') as conn:
+            assert conn.execute("SELECT COUNT(*) FROM purchase_events WHERE item_name = 'Test Chutney'").fetchone()[0] == 0
+
+def test_households_are_isolated():
+    init_db()
+    for household in ('test-home-a', 'test-home-b'):
+        for item in get_shopping_list(household):
+            remove_shopping_item(item['id'], household=household)
+    item_id = add_shopping_item("Test Bread", "bakery", household='test-home-a')
+
+    assert [i['item_name'] for i in get_shopping_list('test-home-a')] == ["Test Bread"]
+    assert get_shopping_list('test-home-b') == []
+    # Another household can't remove the item by id
+    assert not remove_shopping_item(item_id, household='test-home-b')
+    assert remove_shopping_item(item_id, household='test-home-a')
+
+def test_in_memory_storage_is_shared_across_connections():
+    storage = Storage(':memory:')
+    with storage.connect() as conn:
+        conn.execute("INSERT INTO shopping_list (item_name) VALUES ('Test Tea')")
+        conn.commit()
+    with storage.connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM shopping_list").fetchone()[0] == 1
+    storage.close()
+    # A new in-memory storage starts empty
+    with Storage(':memory:').connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM shopping_list").fetchone()[0] == 0
+
+def _interval_row(household, item_name):
+    with get_db(household) as conn:
+        row = conn.execute('''
+            SELECT purchase_count, interval_count, interval_days_total, last_purchased_at
+            FROM item_intervals WHERE household_id = ? AND item_name = ?
+        ''', (household, item_name)).fetchone()
+    return dict(row)
+
+def test_interval_rollup_counts_calendar_days():
+    init_db()
+    household = 'test-intervals'
+    with get_db(household) as conn:
+        conn.execute("DELETE FROM item_intervals WHERE household_id = ?", (household,))
+
+    # Same-day repeat adds nothing; the next morning is a day even though it's under 24h later
+    for at in ('2024-01-01 09:00:00', '2024-01-01 18:00:00', '2024-01-02 08:30:00', '2024-01-05 08:00:00'):
+        add_to_history("Test Coffee", "beverages", at, household=household)
+    row = _interval_row(household, 'test coffee')
+    assert (row['purchase_count'], row['interval_count'], row['interval_days_total']) == (4, 2, 4)
+
+    # Bought daily, half an hour earlier each day: every gap is under 24h but each is a new day
+    for at in ('2024-01-01 10:00:00', '2024-01-02 09:30:00', '2024-01-03 09:00:00', '2024-01-04 08:30:00'):
+        add_to_history("Test Bagel", "bakery", at, household=household)
+    row = _interval_row(household, 'test bagel')
+    assert (row['interval_count'], row['interval_days_total']) == (3, 3)
+
+def test_interval_rollup_handles_out_of_order_events():
+    init_db()
+    household = 'test-intervals-late'
+    with get_db(household) as conn:
+        conn.execute("DELETE FROM item_intervals WHERE household_id = ?", (household,))
+
+    events = [("Test Rice", "grains", at) for at in ('2024-01-10 12:00:00', '2024-01-03 12:00:00', '2024-01-06 12:00:00')]
+    write_history_batch({("Test Rice", "grains"): 3}, events, household=household)
+    row = _interval_row(household, 'test rice')
+    assert (row['interval_count'], row['interval_days_total']) == (2, 7)
+    assert row['last_purchased_at'] == '2024-01-10 12:00:00'
+
+    # A late event from an earlier batch only counts as a purchase
+    add_to_history("Test Rice", "grains", '2024-01-08 12:00:00', household=household)
+    row = _interval_row(household, 'test rice')
+    assert (row['purchase_count'], row['interval_count'], row['interval_days_total']) == (4, 2, 7)
+    assert row['last_purchased_at'] == '2024-01-10 12:00:00'
+
+def test_due_items_use_own_interval_then_prior():
+    init_db()
+    household = 'test-due'
+    with get_db(household) as conn:
+        conn.execute("DELETE FROM item_intervals WHERE household_id = ?", (household,))
+    save_repurchase_priors([('test lentils', 5), ('test flour', 7)])
+
+    for at in ('2024-01-01 12:00:00', '2024-01-04 12:00:00'):
+        add_to_history("Test Soap", "household", at, household=household)   # own interval: 3 days
+    add_to_history("Test Lentils", "grains", '2024-01-01 12:00:00', household=household)   # prior: 5 days
+    add_to_history("Test Flour", "grains", '2024-01-06 12:00:00', household=household)     # prior: 7 days
+    add_to_history("Test Saffron", "spices", '2023-01-01 12:00:00', household=household)   # no interval at all
+
+    due = get_due_items('2024-01-08 12:00:00', household=household)
+    # Most overdue first: lentils 7/5 days, soap 4/3 days; flour isn't due, saffron has nothing to go on
+    assert [(row['item_name'], row['interval_days']) for row in due] == [('test lentils', 5), ('test soap', 3)]
+    assert get_due_items('2024-01-08 12:00:00', household='test-due-empty') == []
+
+def test_completing_an_item_twice_records_one_purchase():
+    from app import create_app
+    client = create_app(TestingConfig).test_client()
+    headers = {'X-Household-ID': 'test-complete'}
+    item_id = client.post('/api/shopping/add', json={'item_name': 'Test Kefir'}, headers=headers).get_json()['item']['id']
+
+    statuses = [client.put(f'/api/shopping/{item_id}/complete', headers=headers).status_code for _ in range(3)]
+    assert statuses == [200, 404, 404]
+    history_writer.flush()
+    with get_db('test-complete') as conn:
+        events = conn.execute("SELECT COUNT(*) FROM purchase_events WHERE household_id = 'test-complete'").fetchone()[0]
+        frequency = conn.execute("SELECT frequency FROM purchase_history WHERE household_id = 'test-complete'").fetchone()[0]
+    assert (events, frequency) == (1, 1)
+
 if __name__ == "__main__":
     test_add_item()
     test_remove_item()
     test_get_empty_list()
+    test_history_writer_coalesces_and_notifies()
+    test_create_app_configures_history_writer()
+    test_switching_config_flushes_history_into_the_old_database()
+    test_households_are_isolated()
+    test_in_memory_storage_is_shared_across_connections()
+    test_interval_rollup_counts_calendar_days()
+    test_interval_rollup_handles_out_of_order_events()
+    test_due_items_use_own_interval_then_prior()
+    test_completing_an_item_twice_records_one_purchase()
     print("All database tests passed!")
@@ -0,0 +1,69 @@
+import sys
+sys.path.insert(0, '/app')
+
+from app.config import TestingConfig
+from app.events import ChangeFeed, StreamLimitReached, SuggestionPublisher
+
+def test_change_feed_replays_after_last_event_id():
+    feed = ChangeFeed()
+    feed.publish('item_upserted', {'id': 1})
+    second = feed.publish('item_removed', {'id': 1})
+    stream = feed.stream(last_event_id=second - 1)
+    assert next(stream).startswith('retry:')
+    assert next(stream) == f'id: {second}\nevent: item_removed\ndata: {{"id": 1}}\n\n'
+    stream.close()
+
+def test_suggestion_publisher_sends_only_changes():
+    feed = ChangeFeed()
+    received = feed.subscribe()
+    current = [{'item': 'milk', 'confidence': 0.9}, {'item': 'eggs', 'confidence': 0.5}]
+    publisher = SuggestionPublisher(feed, lambda household: list(current))
+
+    publisher.publish_delta()
+    assert publisher.publish_delta() is None
+
+    current[1] = {'item': 'bread', 'confidence': 0.6}
+    publisher.publish_delta()
+    received.get_nowait()
+    _, event, delta = received.get_nowait()
+    assert event == 'suggestions'
+    assert delta == {'added': [{'item': 'bread', 'confidence': 0.6}], 'removed': ['eggs'], 'order': ['milk', 'bread']}
+
+def test_change_feed_caps_open_streams():
+    feed = ChangeFeed(max_streams=1)
+    first = feed.subscribe()
+    try:
+        feed.subscribe(household='other-home')
+        assert False, 'second stream should be refused'
+    except StreamLimitReached:
+        pass
+    feed.unsubscribe(first)
+    feed.unsubscribe(feed.subscribe())
+
+def test_stream_route_returns_503_over_the_cap():
+    from app import create_app
+    from app.events import change_feed
+    saved = change_feed.max_streams
+    try:
+        client = create_app(type('OneStreamConfig', (TestingConfig,), {'MAX_EVENT_STREAMS': 1})).test_client()
+        first = client.get('/api/events/stream', buffered=False)
+        assert first.status_code == 200
+        refused = client.get('/api/events/stream')
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After']
+        # Closing the open stream frees its slot, even before any frame was read
+        first.close()
+        second = client.get('/api/events/stream', buffered=False)
+        assert second.status_code == 200
+        second.close()
+        # Ordinary requests are never refused
+        assert client.get('/api/shopping/list').status_code == 200
+    finally:
+        change_feed.max_streams = saved
+
+if __name__ == "__main__":
+    test_change_feed_replays_after_last_event_id()
+    test_suggestion_publisher_sends_only_changes()
+    test_change_feed_caps_open_streams()
+    test_stream_route_returns_503_over_the_cap()
+    print("All event tests passed!")
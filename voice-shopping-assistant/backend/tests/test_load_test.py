@@ -0,0 +1,30 @@
+import sys
+sys.path.insert(0, '/app')
+
+import app.voice_processor
+from scripts.load_test import StubVoiceProcessor, build_transcripts, percentile, run_load, start_server
+
+def test_stub_voice_processor_is_deterministic():
+    voice = StubVoiceProcessor(build_transcripts(seed=1))
+    assert voice.transcribe_audio(b'clip') == voice.transcribe_audio(b'clip')
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+
+def test_run_load_reports_each_endpoint():
+    saved = app.voice_processor.voice_processor
+    server, base_url = start_server()
+    try:
+        report = run_load(base_url, requests=40, concurrency=2, mix='voice=1,add=1,complete=1')
+    finally:
+        server.shutdown()
+        app.voice_processor.voice_processor = saved
+
+    endpoints = report['endpoints']
+    assert sum(s['requests'] for s in endpoints.values()) == 40
+    assert {'POST /api/voice/process', 'POST /api/shopping/add'} <= set(endpoints)
+    assert all(s['errors'] == 0 and s['p50_ms'] <= s['p99_ms'] for s in endpoints.values())
+
+if __name__ == "__main__":
+    test_stub_voice_processor_is_deterministic()
+    test_run_load_reports_each_endpoint()
+    print("All load test harness tests passed!")
@@ -0,0 +1,25 @@
+import sys
+sys.path.insert(0, '/app')
+
+import json
+import pandas as pd
+from app.member_recommendations import build_member_recommendations
+
+def test_member_recommendations_use_own_history_and_rules():
+    df = pd.DataFrame({
+        'Member_number': [1, 1, 1, 1, 2, 2, 3],
+        'Date': ['01-01-2015', '01-01-2015', '02-01-2015', '02-01-2015', '01-01-2015', '03-01-2015', '04-01-2015'],
+        'itemDescription': ['Whole Milk', 'bread', 'whole milk', 'bread', 'beer', 'beer', 'chips'],
+    })
+    rules = [{'base': ['beer'], 'add': ['chips'], 'support': 0.1, 'confidence': 0.9, 'lift': 2.0}]
+    table = build_member_recommendations(df, rules, top_n=2)
+
+    assert list(table['member_number']) == [1, 2, 3]
+    first = json.loads(table['items'][0])
+    assert {r['item'] for r in first} == {'whole milk', 'bread'}
+    second = json.loads(table['items'][1])
+    assert [r['item'] for r in second] == ['beer', 'chips']
+
+if __name__ == "__main__":
+    test_member_recommendations_use_own_history_and_rules()
+    print("All member recommendation tests passed!")
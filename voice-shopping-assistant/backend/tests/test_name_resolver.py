@@ -0,0 +1,123 @@
+import sys
+sys.path.insert(0, '/app')
+
+import threading
+
+import app.name_resolver
+from app.apriori import engine
+from app.config import TestingConfig
+from app.name_resolver import NameResolver, load_known_names
+
+def make_resolver():
+    resolver = NameResolver()
+    resolver.add_names(['whole milk', 'banana', 'ham', 'root vegetables', 'milk'])
+    return resolver
+
+def test_resolves_misheard_names():
+    resolver = make_resolver()
+    assert resolver.resolve('hole milk')['name'] == 'whole milk'
+    assert resolver.resolve('Bananna')['name'] == 'banana'
+    assert resolver.resolve('rot vegtables')['name'] == 'root vegetables'
+
+def test_keeps_unknown_and_exact_names():
+    resolver = make_resolver()
+    assert not resolver.resolve('jam')['resolved']
+    assert resolver.canonical('Jam') == 'Jam'
+    assert resolver.canonical('Milk') == 'Milk'
+
+def test_short_real_words_are_not_rewritten():
+    resolver = NameResolver()
+    load_known_names(resolver)
+    # Each is one edit from a dataset name at exactly the confidence threshold
+    for word in ['beer', 'beet', 'peas', 'ale', 'foil']:
+        result = resolver.resolve(word)
+        assert result['name'] == word and not result['distance'], (word, result)
+        assert resolver.canonical(word) == word
+    assert resolver.resolve('hole milk')['name'] == 'whole milk'
+
+def test_adding_beer_keeps_beer():
+    from app import create_app
+
+    saved_resolver = app.name_resolver.name_resolver
+    app.name_resolver.name_resolver = NameResolver()
+    try:
+        client = create_app(TestingConfig).test_client()
+        response = client.post('/api/shopping/add', json={'item_name': 'beer'})
+        assert response.status_code == 201
+        assert response.get_json()['item']['item_name'] == 'beer'
+        assert 'resolved_from' not in response.get_json()
+    finally:
+        app.name_resolver.name_resolver = saved_resolver
+
+def test_fresh_app_resolves_dataset_names_before_training():
+    # Let training started by earlier tests' background work land before clearing the rules
+    engine.ensure_fitted()
+    saved_resolver, saved_rules = app.name_resolver.name_resolver, engine.rules
+    app.name_resolver.name_resolver = NameResolver()
+    engine._set_rules([])
+    try:
+        from app import create_app
+        client = create_app(TestingConfig).test_client()
+        # Background publishers may still ask for rules; only training from this thread counts
+        trained_from = []
+        engine.set_loader(lambda _: trained_from.append(threading.current_thread()))
+
+        response = client.post('/api/shopping/add', json={'item_name': 'hole milk'})
+        assert response.status_code == 201
+        assert response.get_json()['item']['item_name'] == 'whole milk'
+        assert response.get_json()['resolved_from'] == 'hole milk'
+
+        response = client.post('/api/voice/process', json={'text': 'add hole milk'})
+        assert response.status_code == 200
+        assert response.get_json()['item_name'] == 'whole milk'
+        assert response.get_json()['heard_item_name'] == 'hole milk'
+        # Nothing needed the rules, so training never ran
+        assert threading.current_thread() not in trained_from
+    finally:
+        app.name_resolver.name_resolver = saved_resolver
+        engine._set_rules(saved_rules)
+
+def test_household_names_stay_in_their_household():
+    resolver = make_resolver()
+    resolver.add_names(['grandmas pickle'], household='home-a')
+    assert resolver.resolve('grandmas pickel', household='home-a')['name'] == 'grandmas pickle'
+    assert not resolver.resolve('grandmas pickel', household='home-b')['resolved']
+    assert not resolver.resolve('grandmas pickel')['resolved']
+    # Shared names still resolve for every household
+    assert resolver.resolve('hole milk', household='home-b')['name'] == 'whole milk'
+
+def test_purchase_history_does_not_leak_between_households():
+    from app import create_app
+    from app.database import add_to_history
+    from app.history_writer import history_writer
+
+    saved_resolver = app.name_resolver.name_resolver
+    app.name_resolver.name_resolver = NameResolver()
+    try:
+        client = create_app(TestingConfig).test_client()
+        add_to_history("Zaatar Mix", "spices", household='test-home-a')
+        private = {'item_name': 'zatar mix'}
+
+        response = client.post('/api/shopping/add', json=private, headers={'X-Household-ID': 'test-home-b'})
+        assert response.get_json()['item']['item_name'] == 'zatar mix'
+        response = client.post('/api/shopping/add', json=private, headers={'X-Household-ID': 'test-home-a'})
+        assert response.get_json()['item']['item_name'] == 'zaatar mix'
+
+        # Purchases flushed later join the buyer's vocabulary only
+        history_writer.record("Sumac Blend", "spices", household='test-home-a')
+        history_writer.flush()
+        resolver = app.name_resolver.name_resolver
+        assert resolver.resolve('sumak blend', household='test-home-a')['name'] == 'sumac blend'
+        assert not resolver.resolve('sumak blend', household='test-home-b')['resolved']
+    finally:
+        app.name_resolver.name_resolver = saved_resolver
+
+if __name__ == "__main__":
+    test_resolves_misheard_names()
+    test_keeps_unknown_and_exact_names()
+    test_short_real_words_are_not_rewritten()
+    test_adding_beer_keeps_beer()
+    test_fresh_app_resolves_dataset_names_before_training()
+    test_household_names_stay_in_their_household()
+    test_purchase_history_does_not_leak_between_households()
+    print("All name resolver tests passed!")
@@ -2,6 +2,7 @@ import sys
 sys.path.insert(0, '/app')
 
 from app.nlp_processor import NLPProcessor
+from app.grammars import get_grammar, register_grammar
 
 def test_extract_command_add():
     nlp = NLPProcessor()
@@ -39,16 +40,51 @@ def test_process_voice_command():
     assert result["quantity"] == 2.0
     assert result["category"] == "dairy"
 
+def test_article_before_unit_is_one():
+    nlp = NLPProcessor()
+    result = nlp.process_voice_command("Get a gallon of milk")
+    assert (result["item_name"], result["quantity"], result["unit"]) == ("milk", 1.0, "gallon")
+    result = nlp.process_voice_command("add a can of tomatoes")
+    assert (result["item_name"], result["quantity"], result["unit"]) == ("tomatoes", 1.0, "can")
+    assert nlp.extract_quantity("get a gallon of milk") == (1.0, "gallon")
+    # Anywhere else an article is just dropped
+    result = nlp.process_voice_command("add an apple")
+    assert (result["item_name"], result["quantity"], result["unit"]) == ("apple", 1, None)
+    assert nlp.process_voice_command("add a dozen eggs")["quantity"] == 12.0
+
 def test_empty_command():
     nlp = NLPProcessor()
     result = nlp.process_voice_command("")
     assert "error" in result
 
+def test_process_voice_command_per_language():
+    nlp = NLPProcessor()
+    result = nlp.process_voice_command("Añade dos litros de leche", "es-ES")
+    assert (result["command"], result["item_name"], result["quantity"], result["unit"]) == ("add", "leche", 2.0, "liter")
+    assert result["category"] == "dairy"
+
+    result = nlp.process_voice_command("do kilo aloo chahiye", "hi-IN")
+    assert (result["item_name"], result["quantity"], result["unit"], result["category"]) == ("aloo", 2.0, "kg", "produce")
+    assert nlp.process_voice_command("doodh add kar do", "hi-IN")["quantity"] == 1
+    assert nlp.extract_command("दूध हटाओ", "hi-IN") == "remove"
+
+def test_grammars_compile_once_per_language():
+    assert get_grammar("fr-FR") is get_grammar("fr-CA")
+    assert get_grammar("xx-XX") is get_grammar("en-US")
+    register_grammar("pt", {'add': ['adicione'], 'remove': ['remova'], 'fillers': ['de'],
+                            'numbers': {'dois': 2}, 'units': {'liter': ['litros']},
+                            'categories': {'dairy': ['leite']}})
+    result = NLPProcessor().process_voice_command("adicione dois litros de leite", "pt-BR")
+    assert (result["item_name"], result["quantity"], result["category"]) == ("leite", 2.0, "dairy")
+
 if __name__ == "__main__":
     test_extract_command_add()
     test_extract_command_remove()
     test_extract_category()
     test_extract_quantity()
     test_process_voice_command()
+    test_article_before_unit_is_one()
     test_empty_command()
+    test_process_voice_command_per_language()
+    test_grammars_compile_once_per_language()
     print("All NLP tests passed!")
@@ -0,0 +1,25 @@
+import sys
+sys.path.insert(0, '/app')
+
+import pandas as pd
+from app.repurchase import estimate_repurchase_intervals
+
+def test_repurchase_intervals_pool_gaps_between_distinct_days():
+    # Rows out of date order, with a same-day duplicate, as in the raw dataset
+    df = pd.DataFrame({
+        'Member_number': [1, 1, 1, 1, 2, 2, 1, 2],
+        'Date': ['11-01-2015', '01-01-2015', '04-01-2015', '01-01-2015', '07-01-2015', '02-01-2015',
+                 '01-01-2015', '03-01-2015'],
+        'itemDescription': ['whole milk', 'Whole Milk ', 'whole milk', 'whole milk', 'whole milk', 'whole milk',
+                            'bread', 'bread'],
+    })
+    intervals = estimate_repurchase_intervals(df, min_observations=3)
+
+    # Member 1: 1 -> 4 -> 11 (3 and 7 days), member 2: 2 -> 7 (5 days); median 5
+    assert intervals.to_dict() == {'whole milk': 5.0}
+    # Bread was never bought twice by the same member
+    assert estimate_repurchase_intervals(df, min_observations=1).to_dict() == {'whole milk': 5.0}
+
+if __name__ == "__main__":
+    test_repurchase_intervals_pool_gaps_between_distinct_days()
+    print("All repurchase tests passed!")
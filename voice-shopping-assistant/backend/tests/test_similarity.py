@@ -0,0 +1,51 @@
+import sys
+sys.path.insert(0, '/app')
+
+from app.similarity import SimilarityIndex, similarity_index
+from app.suggestions import get_suggestions
+from app.training import load_baskets
+
+BASKETS = (
+    [['whole milk', 'bread', 'butter']] * 10 +
+    [['oat milk', 'bread', 'butter']] * 10 +
+    [['beer', 'chips']] * 10 +
+    [['soda', 'chips']] * 10 +
+    [['whole milk', 'eggs'], ['oat milk', 'eggs'], ['beer', 'peanuts'], ['soda', 'peanuts']] +
+    [['whole milk', 'shopping bags'], ['oat milk', 'shopping bags']] * 5
+)
+
+def test_similar_and_substitutes_cover_vocabulary():
+    index = SimilarityIndex().fit(BASKETS, dimensions=4)
+    assert set(index.neighbors) == {i for b in BASKETS for i in b}
+    assert index.similar('whole milk', top_n=1)[0]['item'] == 'oat milk'
+    assert index.substitutes('Whole milk', top_n=1)[0]['item'] == 'oat milk'
+    assert index.similar('unknown item') == []
+    # Beer and soda fill the same role, but nothing in their names says they are the same kind of product
+    assert index.substitutes('beer') == []
+    # Complements share baskets, so they are never substitutes
+    assert 'bread' not in [s['item'] for s in index.substitutes('whole milk')]
+    assert 'shopping bags' not in [s['item'] for s in index.similar('whole milk', top_n=10)]
+
+def test_substitutes_on_real_baskets_are_not_noise():
+    baskets = load_baskets()
+    similarity_index.fit(baskets)
+    # A real share of the catalog gets learned substitutes, and they are the same kind of product
+    assert similarity_index.fit_stats['substitutes'] >= 30
+    assert similarity_index.substitutes('whole milk', top_n=1)[0]['item'] == 'butter milk'
+    assert similarity_index.substitutes('canned beer', top_n=1)[0]['item'] == 'bottled beer'
+    assert similarity_index.substitutes('white bread', top_n=1)[0]['item'] == 'brown bread'
+    assert similarity_index.substitutes('shopping bags') == []
+    # Shopping bags share plenty of baskets with everything, but are never suggested
+    for name in ('whole milk', 'pastry'):
+        assert 'shopping bags' not in [s['item'] for s in similarity_index.similar(name, top_n=10)]
+    assert all('shopping bags' != s['item'] for subs in similarity_index.substitute_map.values() for s in subs)
+
+    suggestions = get_suggestions([], [{'item_name': 'milk'}, {'item_name': 'whole milk'}])
+    subs = [s['item'] for s in suggestions if s['category'] == 'substitute']
+    assert 'almond milk' in subs
+    assert 'shopping bags' not in subs
+
+if __name__ == "__main__":
+    test_similar_and_substitutes_cover_vocabulary()
+    test_substitutes_on_real_baskets_are_not_noise()
+    print("All similarity tests passed!")
@@ -0,0 +1,50 @@
+import sys
+sys.path.insert(0, '/app')
+
+import threading
+import time
+from app.config import TestingConfig
+from app.lazy import RunOnce
+from scripts.startup_report import measure_startup
+
+def test_create_app_does_not_import_heavy_modules():
+    report = measure_startup({'DATABASE': ':memory:', 'WARM_START': '0'})
+    assert not report['warm_start']
+    assert report['lazy_loaded'] == []
+
+def test_startup_report_measures_warm_start_memory():
+    report = measure_startup({'DATABASE': ':memory:', 'WARM_START': '1'})
+    assert report['warm_start']
+    assert report['settled_rss_kb'] == report['warm_rss_kb'] >= report['max_rss_kb']
+
+def test_run_once_makes_callers_wait_for_the_loader():
+    calls = []
+    def slow_loader(target):
+        time.sleep(0.05)
+        calls.append(target)
+
+    once = RunOnce()
+    once.set(slow_loader)
+    threads = [threading.Thread(target=once.run, args=('index',)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ['index']
+
+def test_warm_start_trains_after_boot():
+    from app import create_app
+    from app.apriori import engine
+
+    create_app(type('WarmConfig', (TestingConfig,), {'WARM_START': True}))
+    warm_up = [t for t in threading.enumerate() if t.name == 'warm-up']
+    assert warm_up
+    warm_up[0].join()
+    assert engine.rules
+
+if __name__ == "__main__":
+    test_create_app_does_not_import_heavy_modules()
+    test_startup_report_measures_warm_start_memory()
+    test_run_once_makes_callers_wait_for_the_loader()
+    test_warm_start_trains_after_boot()
+    print("All startup tests passed!")
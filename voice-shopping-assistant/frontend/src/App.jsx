@@ -2,7 +2,7 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { VoiceInput } from './components/VoiceInput';
 import { ShoppingList } from './components/ShoppingList';
 import { Suggestions } from './components/Suggestions';
-import { shoppingAPI, voiceAPI } from './api';
+import { shoppingAPI, voiceAPI, changeFeed } from './api';
 import './App.css';
 
 function App() {
@@ -13,6 +13,20 @@ function App() {
 
   useEffect(() => {
     loadShoppingList();
+
+    // Keep the list in sync with changes made here or on other devices
+    const upsertItem = (changed) => setItems((current) =>
+      current.some(item => item.id === changed.id)
+        ? current.map(item => item.id === changed.id ? changed : item)
+        : [...current, changed]
+    );
+    const removeItem = ({ id }) => setItems((current) => current.filter(item => item.id !== id));
+    const unsubscribeUpsert = changeFeed.subscribe('item_upserted', upsertItem);
+    const unsubscribeRemove = changeFeed.subscribe('item_removed', removeItem);
+    return () => {
+      unsubscribeUpsert();
+      unsubscribeRemove();
+    };
   }, []);
 
   const loadShoppingList = async () => {
@@ -29,13 +43,13 @@ function App() {
     }
   };
 
-  const handleVoiceText = async (text) => {
+  const handleVoiceText = async (text, language) => {
     try {
       setLoading(true);
       setError(null);
       
       // Process the voice command
-      const response = await voiceAPI.processCommand(text);
+      const response = await voiceAPI.processCommand(text, language);
       setLastCommand(response.data);
 
       if (response.data.command === 'add') {
@@ -2,10 +2,19 @@ import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
+// Lists, history and suggestions are per household; share a list by sharing the household id
+export const getHouseholdId = () => localStorage.getItem('householdId') || 'default';
+export const setHouseholdId = (householdId) => localStorage.setItem('householdId', householdId);
+
 const api = axios.create({
   baseURL: `${API_URL}/api`
 });
 
+api.interceptors.request.use((config) => {
+  config.headers['X-Household-ID'] = getHouseholdId();
+  return config;
+});
+
 export const shoppingAPI = {
   getList: () => api.get('/shopping/list'),
   addItem: (item) => api.post('/shopping/add', item),
@@ -15,7 +24,7 @@ export const shoppingAPI = {
 };
 
 export const voiceAPI = {
-  processCommand: (text) => api.post('/voice/process', { text }),
+  processCommand: (text, language = 'en-US') => api.post('/voice/process', { text, language_code: language }),
   transcribeAudio: (audioFile, language = 'en-US') => {
     const formData = new FormData();
     formData.append('audio', audioFile);
@@ -31,3 +40,45 @@ export const suggestionsAPI = {
   getSmartSuggestions: () => api.get('/suggestions/'),
   getHistory: () => api.get('/suggestions/history')
 };
+
+// One EventSource per page, shared by every component that listens for changes.
+// The browser reconnects on its own and resends Last-Event-ID, so missed events are replayed.
+// It gives up for good when the server refuses the stream (503 when too many are open),
+// so then we reopen it ourselves after a pause, passing the last id we saw.
+const STREAM_RETRY_MS = 5000;
+const feedListeners = {};
+let eventSource = null;
+let lastEventId = null;
+
+const dispatch = (eventName) => (event) => {
+  if (event.lastEventId) lastEventId = event.lastEventId;
+  const data = JSON.parse(event.data);
+  feedListeners[eventName].forEach((listener) => listener(data));
+};
+
+const openStream = () => {
+  // EventSource can't send headers, so the household goes in the query string
+  const params = new URLSearchParams({ household: getHouseholdId() });
+  if (lastEventId) params.set('last_event_id', lastEventId);
+  eventSource = new EventSource(`${API_URL}/api/events/stream?${params}`);
+  Object.keys(feedListeners).forEach((eventName) => {
+    eventSource.addEventListener(eventName, dispatch(eventName));
+  });
+  eventSource.onerror = () => {
+    if (eventSource.readyState === EventSource.CLOSED) {
+      setTimeout(openStream, STREAM_RETRY_MS);
+    }
+  };
+};
+
+export const changeFeed = {
+  subscribe: (eventName, handler) => {
+    if (!feedListeners[eventName]) {
+      feedListeners[eventName] = new Set();
+      if (eventSource) eventSource.addEventListener(eventName, dispatch(eventName));
+    }
+    if (!eventSource) openStream();
+    feedListeners[eventName].add(handler);
+    return () => feedListeners[eventName].delete(handler);
+  }
+};
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { suggestionsAPI, shoppingAPI } from '../api';
+import { suggestionsAPI, shoppingAPI, changeFeed } from '../api';
 import './Suggestions.css';
 
 export function Suggestions({ items, onAddItem, loading }) {
@@ -7,16 +7,28 @@ export function Suggestions({ items, onAddItem, loading }) {
   const [loadingSuggestions, setLoadingSuggestions] = useState(false);
 
   useEffect(() => {
-    // Fetch suggestions whenever items change
-    if (items && items.length > 0) {
-      fetchSuggestions();
-    }
-  }, [items]);
+    // Fetch once, then apply the deltas the server pushes after each list change
+    fetchSuggestions();
+
+    const applyDelta = ({ added, removed, order }) => {
+      setSuggestions((current) => {
+        const byItem = new Map(current.map(s => [s.item.toLowerCase(), s]));
+        removed.forEach(name => byItem.delete(name.toLowerCase()));
+        added.forEach(s => byItem.set(s.item.toLowerCase(), s));
+        if (order.some(name => !byItem.has(name.toLowerCase()))) {
+          // Missed an update: fall back to a full fetch
+          fetchSuggestions();
+          return current;
+        }
+        return order.map(name => byItem.get(name.toLowerCase()));
+      });
+    };
+    return changeFeed.subscribe('suggestions', applyDelta);
+  }, []);
 
   const fetchSuggestions = async () => {
     setLoadingSuggestions(true);
     try {
-      console.log('Fetching suggestions for items:', items);
       const response = await suggestionsAPI.getSmartSuggestions();
       console.log('API Response:', response.data);
       setSuggestions(response.data.suggestions || []);
@@ -94,13 +94,13 @@ export function VoiceInput({ onText, loading }) {
   const handleTextSubmit = (e) => {
     e.preventDefault();
     if (textInput.trim()) {
-      onText(textInput.trim());
+      onText(textInput.trim(), language);
       setTextInput('');
     }
   };
 
   const handleConfirmTranscription = () => {
-    onText(transcribed);
+    onText(transcribed, language);
     setShowConfirmation(false);
     setTranscribed('');
   };